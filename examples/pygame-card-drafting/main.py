@@ -2,6 +2,8 @@ import pygame
 import sys
 from src.screens.alpha_crow_selection import AlphaCrowSelectionScreen
 from src.game_state import GameState
+from src.game_loop import FixedTimestep
+from src.profiler import FrameProfiler
 
 # Initialize pygame
 pygame.init()
@@ -22,30 +24,50 @@ game_state = GameState()
 # Start with the alpha crow selection screen
 current_screen = AlphaCrowSelectionScreen(screen, game_state)
 
-# Main game loop
+# Main game loop: screens update in fixed steps, drawing runs as fast as it can
+timestep = FixedTimestep()
+profiler = FrameProfiler()  # F3 shows frame timings, F4 records a Chrome trace
 running = True
 while running:
+    # Cap the frame rate; the time since the last frame is what the screens simulate
+    steps = timestep.advance(clock.tick(60))
+    profiler.begin_frame()
+    screen_name = type(current_screen).__name__
+    
     # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        
-        # Pass events to current screen
-        next_screen = current_screen.handle_event(event)
-        if next_screen:
-            current_screen = next_screen
+    with profiler.phase("events", f"{screen_name}.handle_event"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()
+                continue
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                if profiler.tracing:
+                    profiler.stop_trace("crows_trace.json")
+                else:
+                    profiler.start_trace()
+                continue
+            
+            # Pass events to current screen
+            next_screen = current_screen.handle_event(event)
+            if next_screen:
+                current_screen = next_screen
     
-    # Update current screen
-    current_screen.update()
+    # Update current screen once per fixed step
+    with profiler.phase("update", f"{screen_name}.update"):
+        for _ in range(steps):
+            current_screen.update()
     
-    # Draw current screen
-    current_screen.draw()
+    # Draw current screen, with the profiler HUD on top
+    with profiler.phase("draw", f"{screen_name}.draw"):
+        current_screen.draw()
+        profiler.draw(screen)
     
     # Update display
-    pygame.display.flip()
-    
-    # Cap the frame rate
-    clock.tick(60)
+    with profiler.phase("flip"):
+        pygame.display.flip()
+    profiler.end_frame()
 
 # Quit pygame
 pygame.quit()
@@ -0,0 +1,51 @@
+"""
+Fixed-timestep timing for the main game loop.
+
+Screens update in steps of a fixed length no matter how fast frames are
+drawn, so the game runs at the same speed on slow and fast machines.
+"""
+
+# Screen updates per second
+UPDATE_RATE = 60
+
+# Length of one update step in milliseconds
+STEP_MS = 1000 / UPDATE_RATE
+
+
+class FixedTimestep:
+    """
+    Accumulates frame time and hands it out as fixed update steps.
+    """
+
+    def __init__(self, step_ms=STEP_MS, max_steps=5):
+        """
+        Initialize the timestep.
+
+        Args:
+            step_ms: Length of one update step in milliseconds
+            max_steps: Most steps to run for a single frame. Time beyond that
+                is dropped, so a long stall doesn't turn into a burst of updates
+                that makes the next frame late too.
+        """
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.accumulator = 0
+
+    def advance(self, elapsed_ms):
+        """
+        Add a frame's elapsed time.
+
+        Args:
+            elapsed_ms: Milliseconds since the last frame, as returned by
+                pygame.time.Clock.tick
+
+        Returns:
+            The number of update steps to run this frame
+        """
+        self.accumulator += elapsed_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            self.accumulator = 0
+            return self.max_steps
+        self.accumulator -= steps * self.step_ms
+        return steps
@@ -1,3 +1,34 @@
+import weakref
+
+
+class CardSet:
+    """
+    An ordered set of cards, by identity. Two copies of the same catalog card
+    are two members.
+    
+    Iterating, len and "in" work as on a list of the cards, in the order they
+    were added, but adding and removing take O(1).
+    """
+    
+    def __init__(self):
+        self.cards = {}  # id(card) -> card, in the order added
+        
+    def __iter__(self):
+        return iter(self.cards.values())
+    
+    def __len__(self):
+        return len(self.cards)
+    
+    def __contains__(self, card):
+        return id(card) in self.cards
+    
+    def add(self, card):
+        self.cards[id(card)] = card
+        
+    def discard(self, card):
+        self.cards.pop(id(card), None)
+
+
 class GameState:
     """
     Manages the overall state of the game, including player selections and progress.
@@ -7,8 +38,11 @@ class GameState:
         # Player's selected alpha crow (None until selected)
         self.alpha_crow = None
         
-        # Player's team of cards
-        self.team_cards = []
+        # Player's team of cards, in the order they joined the team
+        self.team_cards = CardSet()
+        
+        # Team position of each placed card: id(card) -> (row, index)
+        self.team_slots = {}
         
         # Team positions (front row and back row)
         self.team_positions = {
@@ -16,6 +50,14 @@ class GameState:
             "back": [None, None]          # 2 positions in back row
         }
         
+        # Team totals, kept up to date as cards are placed and removed
+        self.team_attack = 0
+        self.team_defense = 0
+        
+        # Weak references to the functions called with this game state
+        # whenever the team changes
+        self.team_observers = []
+        
         # Available cards to draft
         self.available_cards = []
         
@@ -54,25 +96,134 @@ class GameState:
             row: Optional row descriptor (front/back)
             index: Optional index within the row
         """
-        self.team_cards.append(card)
+        self.team_cards.add(card)
         
         # If position information is provided, place the card in that position
         if row and index is not None:
             if row in self.team_positions and 0 <= index < len(self.team_positions[row]):
-                self.team_positions[row][index] = card
+                previous = self.set_team_position(row, index, card)
+                
+                # A card pushed out of its position leaves the team
+                if previous is not None and previous is not card:
+                    self.team_cards.discard(previous)
         
     def remove_team_card(self, card):
         """
         Remove a card from the player's team
         """
         if card in self.team_cards:
-            self.team_cards.remove(card)
+            self.team_cards.discard(card)
             
             # Also remove from team positions if present
-            for row in self.team_positions:
-                if card in self.team_positions[row]:
-                    index = self.team_positions[row].index(card)
-                    self.team_positions[row][index] = None
+            slot = self.team_slots.get(id(card))
+            if slot:
+                self.set_team_position(slot[0], slot[1], None)
+    
+    def has_team_card(self, card):
+        """
+        Check whether a card is on the player's team
+        """
+        return card in self.team_cards
+    
+    def find_team_slot(self, card):
+        """
+        Find the team position a card is in
+        
+        Returns:
+            A (row, index) tuple, or None if the card isn't in a position
+        """
+        return self.team_slots.get(id(card))
+    
+    def set_team_position(self, row, index, card):
+        """
+        Place a card in a team position, updating the team totals
+        
+        Args:
+            row: The row (front/back)
+            index: The index within the row
+            card: The card to place, or None to empty the position
+            
+        Returns:
+            The card that was in the position before, or None
+        """
+        previous = self.team_positions[row][index]
+        if previous is card:
+            return previous
+        
+        if previous:
+            self.team_attack -= previous.attack
+            self.team_defense -= previous.defense
+            self.team_slots.pop(id(previous), None)
+        if card:
+            self.team_attack += card.attack
+            self.team_defense += card.defense
+            
+            # A card is only ever in one position
+            old_slot = self.team_slots.get(id(card))
+            if old_slot:
+                self.team_positions[old_slot[0]][old_slot[1]] = None
+                self.team_attack -= card.attack
+                self.team_defense -= card.defense
+            self.team_slots[id(card)] = (row, index)
+        self.team_positions[row][index] = card
+        
+        self._notify_team_changed()
+        return previous
+    
+    def swap_team_positions(self, row, index, other_row, other_index):
+        """
+        Swap the cards in two team positions. Either may be empty.
+        """
+        positions = self.team_positions
+        positions[row][index], positions[other_row][other_index] = positions[other_row][other_index], positions[row][index]
+        for slot_row, slot_index in ((row, index), (other_row, other_index)):
+            card = positions[slot_row][slot_index]
+            if card:
+                self.team_slots[id(card)] = (slot_row, slot_index)
+        
+        # The same cards are on the team, so the totals don't change
+        self._notify_team_changed()
+    
+    def recalculate_team_stats(self):
+        """
+        Recount the team totals from scratch, for when a card's stats change
+        while it is on the team
+        """
+        self.team_attack = 0
+        self.team_defense = 0
+        for row in self.team_positions:
+            for card in self.team_positions[row]:
+                if card:
+                    self.team_attack += card.attack
+                    self.team_defense += card.defense
+        
+        self._notify_team_changed()
+    
+    def add_team_observer(self, callback):
+        """
+        Register a function to call, with this game state, whenever the team
+        changes
+        
+        The game state only holds a weak reference, so registering doesn't
+        keep the callback (or, for a method, its object) alive: a screen that
+        is left behind stops being called once nothing else refers to it.
+        """
+        if hasattr(callback, "__self__"):
+            self.team_observers.append(weakref.WeakMethod(callback))
+        else:
+            self.team_observers.append(weakref.ref(callback))
+    
+    def remove_team_observer(self, callback):
+        self.team_observers = [ref for ref in self.team_observers if ref() not in (None, callback)]
+    
+    def _notify_team_changed(self):
+        callbacks = [ref() for ref in self.team_observers]
+        if None in callbacks:
+            # Drop observers that have been freed
+            self.team_observers = [ref for ref, callback in zip(self.team_observers, callbacks) if callback is not None]
+        for callback in callbacks:
+            if callback is not None:
+                callback(self)
     
     def advance_turn(self):
         """
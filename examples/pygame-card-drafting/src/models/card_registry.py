@@ -0,0 +1,103 @@
+import copy
+from collections import namedtuple
+
+from src.models.card import create_team_cards
+
+
+class CardRecord(namedtuple("CardRecord", ["card_id", "name", "cost", "attack", "defense",
+                                           "rarity", "season", "template"])):
+    """
+    An immutable catalog entry for one draftable card.
+
+    Records are tuples with no per-instance dict, so a catalog of thousands of
+    cards stays small, and they can be shared freely between indexes.
+
+    Fields:
+        card_id: Position of the card in the catalog, unique per card
+        name, cost, attack, defense, rarity: The card's catalog values
+        season: The season the card belongs to, or None for any season
+        template: The card object the record was made from; never handed out
+            directly, see create
+    """
+
+    __slots__ = ()
+
+    def create(self):
+        """
+        Create a card instance for play from this record.
+
+        Returns:
+            A new card, a shallow copy of the template. Setting its attributes,
+            e.g. attack or defense, leaves the catalog alone, but any mutable
+            value the template holds (a list, a dict, a surface) is shared, so
+            it has to be replaced rather than changed in place. Its card_id
+            attribute links it back to this record.
+        """
+        card = copy.copy(self.template)
+        card.card_id = self.card_id
+        return card
+
+
+class CardRegistry:
+    """
+    The catalog of draftable cards, built once and indexed by rarity and
+    season.
+    """
+
+    def __init__(self, cards):
+        """
+        Build the registry and its indexes.
+
+        Args:
+            cards: The catalog's card objects, as returned by create_team_cards
+        """
+        self.records = tuple(
+            CardRecord(card_id, card.name, card.cost, card.attack, card.defense,
+                       getattr(card, "rarity", None), getattr(card, "season", None), card)
+            for card_id, card in enumerate(cards)
+        )
+
+        by_rarity = {}
+        by_season = {}
+        for record in self.records:
+            by_rarity.setdefault(record.rarity, []).append(record)
+            by_season.setdefault(record.season, []).append(record)
+
+        # Indexes are tuples, so nothing can change them after the build
+        self.by_rarity = {rarity: tuple(records) for rarity, records in by_rarity.items()}
+
+        # Cards without a season can be drafted in every season
+        any_season = by_season.pop(None, [])
+        self.by_season = {season: tuple(records + any_season) for season, records in by_season.items()}
+        self.any_season = tuple(any_season)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, card_id):
+        """
+        Get a record by its card_id.
+        """
+        return self.records[card_id]
+
+    def for_season(self, season):
+        """
+        Get the records draftable in a season.
+        """
+        return self.by_season.get(season, self.any_season)
+
+
+_registry = None
+
+
+def get_card_registry():
+    """
+    Get the shared card registry, building it on first use.
+    """
+    global _registry
+    if _registry is None:
+        _registry = CardRegistry(create_team_cards())
+    return _registry
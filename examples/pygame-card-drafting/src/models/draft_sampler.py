@@ -0,0 +1,201 @@
+import random
+
+# Default draft weights by rarity, as cards store it in lowercase; rarities
+# not listed weigh 1
+RARITY_WEIGHTS = {
+    "common": 60,
+    "rare": 10,
+    "epic": 4,
+    "legendary": 1,
+}
+
+# Season weights: cards of the current season are favoured and cards of
+# other seasons turn up less often. Cards without a season always weigh 1.
+IN_SEASON_WEIGHT = 2.0
+OFF_SEASON_WEIGHT = 0.25
+
+
+def season_weights(current_season, seasons, in_season=IN_SEASON_WEIGHT, off_season=OFF_SEASON_WEIGHT):
+    """
+    Build the season weights for a season.
+
+    Args:
+        current_season: The season being played
+        seasons: Every season cards can belong to
+
+    Returns:
+        A dict mapping each season to a weight, for DraftSampler
+    """
+    return {season: in_season if season == current_season else off_season for season in seasons}
+
+
+class FenwickTree:
+    """
+    Prefix sums over a list of weights, with O(log n) updates and O(log n)
+    search for the item a running total falls on.
+    """
+
+    def __init__(self, weights):
+        """
+        Build the tree in O(n).
+
+        Args:
+            weights: The initial weight of each item
+        """
+        self.size = len(weights)
+        self.weights = list(weights)
+        self.rebuild()
+
+        # Highest power of two not above size, where the search starts
+        self.top = 1 << (self.size.bit_length() - 1) if self.size else 0
+
+    def rebuild(self):
+        """
+        Recompute every prefix sum from the weights, dropping any rounding
+        error that repeated updates have built up.
+        """
+        self.tree = [0.0] + self.weights
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.total = sum(self.weights)
+
+    def set(self, index, weight):
+        """
+        Change the weight of one item.
+        """
+        delta = weight - self.weights[index]
+        if not delta:
+            return
+        self.weights[index] = weight
+        self.total += delta
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, value):
+        """
+        Find the item whose share of the running total covers value.
+
+        Args:
+            value: A number from 0 up to (not including) total
+
+        Returns:
+            The index of the item
+        """
+        position = 0
+        step = self.top
+        while step:
+            following = position + step
+            if following <= self.size and self.tree[following] <= value:
+                position = following
+                value -= self.tree[following]
+            step >>= 1
+        return min(position, self.size - 1)
+
+
+class DraftSampler:
+    """
+    Weighted, rarity- and season-aware draws from the draft pool.
+
+    Each card's weight is its rarity weight times its season weight. Draws
+    take O(log n), and drafting a card out of the pool or putting one back is
+    an O(log n) update, so nothing is rebuilt or reshuffled per pick. Only
+    changing the weights themselves, e.g. when the season turns or live-ops
+    retune drop rates, rebuilds the tree in O(n).
+    """
+
+    def __init__(self, records, rarity_weights=None, season_weights=None):
+        """
+        Initialize the sampler with every card in the pool.
+
+        Args:
+            records: The CardRecords in the pool, e.g. CardRegistry.records
+            rarity_weights: Dict of lowercase rarity to weight; defaults to
+                RARITY_WEIGHTS
+            season_weights: Dict of season to weight, see season_weights();
+                seasons not listed weigh 1
+        """
+        self.records = tuple(records)
+        self.slots = {record.card_id: slot for slot, record in enumerate(self.records)}
+        self.in_pool = [True] * len(self.records)
+        self.rarity_weights = RARITY_WEIGHTS if rarity_weights is None else rarity_weights
+        self.season_weights = season_weights or {}
+        self.tree = FenwickTree(self._weights())
+
+    def weight(self, record):
+        """
+        Get a card's draft weight, ignoring whether it is still in the pool.
+        """
+        season_weight = self.season_weights.get(record.season, 1.0) if record.season is not None else 1.0
+        rarity = record.rarity.lower() if record.rarity else record.rarity
+        return self.rarity_weights.get(rarity, 1.0) * season_weight
+
+    def _weights(self):
+        return [self.weight(record) if in_pool else 0.0
+                for record, in_pool in zip(self.records, self.in_pool)]
+
+    def set_weights(self, rarity_weights=None, season_weights=None):
+        """
+        Change the rarity and/or season weights. Cards drafted out of the
+        pool stay out.
+        """
+        if rarity_weights is not None:
+            self.rarity_weights = rarity_weights
+        if season_weights is not None:
+            self.season_weights = season_weights
+        self.tree = FenwickTree(self._weights())
+
+    def remove(self, card_id):
+        """
+        Draft a card out of the pool so it is never offered again.
+        """
+        slot = self.slots[card_id]
+        self.in_pool[slot] = False
+        self.tree.set(slot, 0.0)
+
+    def restore(self, card_id):
+        """
+        Put a drafted card back into the pool.
+        """
+        slot = self.slots[card_id]
+        self.in_pool[slot] = True
+        self.tree.set(slot, self.weight(self.records[slot]))
+
+    def draw(self, k, rng=random):
+        """
+        Draw k distinct cards from the pool by weight, without removing them.
+
+        Args:
+            k: Number of cards to draw; fewer are returned if fewer cards in
+                the pool have any weight
+            rng: Random generator to draw with
+
+        Returns:
+            A list of CardRecords
+        """
+        tree = self.tree
+        drawn = []
+        taken = []
+        misses = 0
+        while len(drawn) < k and tree.total > 1e-9:
+            slot = tree.find(rng.random() * tree.total)
+            weight = tree.weights[slot]
+            if weight <= 0:
+                # Rounding error in the sums landed on an empty slot. Rebuild
+                # them, which also zeroes a total left over from drift, and
+                # give up after a few misses rather than spin.
+                misses += 1
+                if misses > 8:
+                    break
+                tree.rebuild()
+                continue
+            # Without replacement: zero the card until this draw is done
+            taken.append((slot, weight))
+            tree.set(slot, 0.0)
+            drawn.append(self.records[slot])
+        for slot, weight in taken:
+            tree.set(slot, weight)
+        return drawn
@@ -0,0 +1,74 @@
+import random
+from collections import Counter, namedtuple
+
+import pytest
+
+from src.models.draft_sampler import RARITY_WEIGHTS, DraftSampler, FenwickTree, season_weights
+
+# The CardRecord fields the sampler reads
+Record = namedtuple("Record", ["card_id", "rarity", "season"])
+
+
+def make_records(rarities, season=None):
+    return [Record(card_id, rarity, season) for card_id, rarity in enumerate(rarities)]
+
+
+def test_fenwick_tree_finds_each_share():
+    tree = FenwickTree([1.0, 0.0, 2.0, 3.0, 0.5])
+    assert tree.total == 6.5
+    assert [tree.find(value) for value in (0.0, 0.99, 1.0, 2.99, 3.0, 5.99, 6.0, 6.49)] == [0, 0, 2, 2, 3, 3, 4, 4]
+    tree.set(1, 4.0)
+    tree.set(3, 0.0)
+    assert tree.total == 7.5
+    assert [tree.find(value) for value in (0.5, 1.0, 4.99, 5.0, 6.99, 7.0)] == [0, 1, 1, 2, 2, 4]
+
+
+def test_rarity_weights_match_card_rarities():
+    sampler = DraftSampler(make_records(["common", "rare", "epic", "legendary", "Rare", None]))
+    assert [sampler.weight(record) for record in sampler.records] == [60, 10, 4, 1, 10, 1.0]
+
+
+@pytest.mark.parametrize("rarity_case", [str.lower, str.capitalize])
+def test_draws_follow_rarity_weights(rarity_case):
+    rarities = ["common", "rare", "epic", "legendary"]
+    sampler = DraftSampler(make_records([rarity_case(rarity) for rarity in rarities]))
+    rng = random.Random(7)
+    draws = 20000
+    counts = Counter(sampler.draw(1, rng)[0].rarity.lower() for _ in range(draws))
+    total = sum(RARITY_WEIGHTS[rarity] for rarity in rarities)
+    for rarity in rarities:
+        expected = draws * RARITY_WEIGHTS[rarity] / total
+        assert abs(counts[rarity] - expected) < 5 * expected ** 0.5 + 5
+
+
+def test_draw_is_without_replacement():
+    sampler = DraftSampler(make_records(["common"] * 5 + ["legendary"]))
+    rng = random.Random(1)
+    for _ in range(100):
+        drawn = sampler.draw(6, rng)
+        assert sorted(record.card_id for record in drawn) == list(range(6))
+    assert sampler.tree.total == 5 * 60 + 1
+
+
+def test_remove_and_restore():
+    sampler = DraftSampler(make_records(["common", "rare", "epic"]))
+    sampler.remove(0)
+    sampler.remove(2)
+    rng = random.Random(3)
+    assert all(sampler.draw(3, rng) == [sampler.records[1]] for _ in range(20))
+    sampler.restore(2)
+    assert {record.card_id for record in sampler.draw(3, rng)} == {1, 2}
+    sampler.remove(1)
+    sampler.remove(2)
+    assert sampler.draw(3, rng) == []
+
+
+def test_season_weights():
+    records = [Record(0, "common", "Spring"), Record(1, "common", "Summer"), Record(2, "common", None)]
+    sampler = DraftSampler(records, season_weights=season_weights("Spring", ["Spring", "Summer"]))
+    assert [sampler.weight(record) for record in records] == [120, 15, 60]
+
+    # Changing the weights keeps drafted cards out of the pool
+    sampler.remove(0)
+    sampler.set_weights(season_weights=season_weights("Summer", ["Spring", "Summer"]))
+    assert sampler.tree.weights == [0.0, 120, 60]
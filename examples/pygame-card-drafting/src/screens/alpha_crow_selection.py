@@ -45,6 +45,16 @@ class AlphaCrowSelectionScreen(BaseScreen):
         # Crow positions
         self.crow_positions = self._calculate_crow_positions()
         
+        # Register a rect around each crow for hit detection
+        for i, position in enumerate(self.crow_positions):
+            crow_rect = pygame.Rect(
+                position[0] - 100,  # Adjust based on crow size
+                position[1] - 150,
+                200,  # Adjust based on crow size
+                300
+            )
+            self.hit_grid.add(crow_rect, i)
+        
         # Description box
         self.description_box_rect = pygame.Rect(
             self.width // 4,
@@ -90,18 +100,9 @@ class AlphaCrowSelectionScreen(BaseScreen):
         if event.type == pygame.MOUSEBUTTONDOWN:
             # Check if a crow was clicked
             mouse_pos = pygame.mouse.get_pos()
-            for i, position in enumerate(self.crow_positions):
-                # Create a rect around the crow for hit detection
-                crow_rect = pygame.Rect(
-                    position[0] - 100,  # Adjust based on crow size
-                    position[1] - 150,
-                    200,  # Adjust based on crow size
-                    300
-                )
-                
-                if crow_rect.collidepoint(mouse_pos):
-                    self.selected_crow_index = i
-                    break
+            crow_index = self.hit_grid.hit(mouse_pos)
+            if crow_index is not None:
+                self.selected_crow_index = crow_index
             
             # Check if the select button was clicked
             mouse_pressed = pygame.mouse.get_pressed()
@@ -1,4 +1,6 @@
 import pygame
+from src.ui.hit_grid import HitGrid
+from src.ui.text_cache import get_text_cache
 
 class BaseScreen:
     """
@@ -33,6 +35,12 @@ class BaseScreen:
         self.subtitle_font = pygame.font.SysFont('Arial', 36)
         self.text_font = pygame.font.SysFont('Arial', 24)
         self.small_font = pygame.font.SysFont('Arial', 18)
+        
+        # Rendered text, shared by every screen
+        self.text_cache = get_text_cache()
+        
+        # Clickable areas, registered once and looked up by mouse position
+        self.hit_grid = HitGrid(self.width, self.height)
     
     def handle_event(self, event):
         """
@@ -48,7 +56,8 @@ class BaseScreen:
     
     def update(self):
         """
-        Update the screen state.
+        Update the screen state. Called once per fixed step of
+        game_loop.STEP_MS milliseconds, independent of the frame rate.
         """
         pass
     
@@ -59,9 +68,10 @@ class BaseScreen:
         # Clear the screen
         self.screen.fill(self.BLACK)
     
-    def draw_text(self, text, font, color, x, y, align="left"):
+    def draw_text(self, text, font, color, x, y, align="left", antialias=True, surface=None):
         """
-        Draw text on the screen.
+        Draw text on the screen. Text drawn before is reused from the text
+        cache rather than rendered again.
         
         Args:
             text: The text to draw
@@ -69,8 +79,10 @@ class BaseScreen:
             color: The color to use
             x, y: The position to draw at
             align: The alignment (left, center, right)
+            antialias: Whether to smooth the edges of the text
+            surface: The surface to draw on, if not the screen
         """
-        text_surface = font.render(text, True, color)
+        text_surface = self.text_cache.render(font, text, color, antialias)
         text_rect = text_surface.get_rect()
         
         if align == "center":
@@ -82,5 +94,7 @@ class BaseScreen:
             text_rect.left = x
             text_rect.top = y
             
-        self.screen.blit(text_surface, text_rect)
+        if surface is None:
+            surface = self.screen
+        surface.blit(text_surface, text_rect)
         return text_rect 
\ No newline at end of file
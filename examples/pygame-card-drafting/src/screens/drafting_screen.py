@@ -1,8 +1,11 @@
 import pygame
-import random
 from src.screens.base_screen import BaseScreen
-from src.models.card import create_team_cards, create_environment_card
+from src.models.card import create_environment_card
+from src.models.card_registry import get_card_registry
+from src.models.draft_sampler import DraftSampler, season_weights
 from src.ui.button import Button
+from src.ui.card_face_cache import CardFaceCache
+from src.game_loop import STEP_MS
 
 class DraftingScreen(BaseScreen):
     """
@@ -22,16 +25,29 @@ class DraftingScreen(BaseScreen):
         # Background color
         self.bg_color = (30, 40, 50)
         
+        # The card catalog, built once and shared by every draft
+        self.card_registry = get_card_registry()
+        
+        # Number of cards offered per draft
+        self.draft_size = 3
+        
+        # Weighted draws from the cards not yet drafted; weights follow the season
+        self.draft_season = game_state.current_season
+        self.draft_sampler = DraftSampler(self.card_registry.records,
+                                          season_weights=season_weights(self.draft_season, self.card_registry.by_season))
+        
         # Available cards to draft
-        self.available_cards = create_team_cards()
-        random.shuffle(self.available_cards)
+        self.available_cards = self.draw_available_cards()
         
         # Number of cards to show at once
-        self.cards_to_show = min(3, len(self.available_cards))
+        self.cards_to_show = min(self.draft_size, len(self.available_cards))
         
         # Currently selected card index
         self.selected_card_index = None
         
+        # Card faces drawn once and blitted every frame after
+        self.card_faces = CardFaceCache()
+        
         # Card being dragged
         self.dragging_card = None
         self.drag_offset = (0, 0)
@@ -56,7 +72,8 @@ class DraftingScreen(BaseScreen):
         self._setup_team_positions()
         
         # Card positions for available cards
-        self.card_positions = self._calculate_card_positions()
+        self.card_positions = []
+        self._update_card_positions()
         
         # Description box
         self.description_box_rect = pygame.Rect(
@@ -71,6 +88,12 @@ class DraftingScreen(BaseScreen):
         self.event_result_timer = 0
         self.event_result_duration = 3000  # 3 seconds to display result
         
+        # Event phase screen, composed when the event starts
+        self.event_overlay = None
+        
+        # The event overlay shows the team totals, so recompose it if they change
+        self.game_state.add_team_observer(self._on_team_changed)
+        
         # Continue button for event phase
         self.continue_button = Button(
             self.width // 2,
@@ -122,6 +145,7 @@ class DraftingScreen(BaseScreen):
                 "row": "front",
                 "index": i
             })
+            self.hit_grid.add(self.team_positions[-1]["rect"], self.team_positions[-1], group="team", layer=1)
         
         # Back row (2 positions)
         back_y = center_y - 80  # Move up more to create clear separation
@@ -134,6 +158,7 @@ class DraftingScreen(BaseScreen):
                 "row": "back",
                 "index": i
             })
+            self.hit_grid.add(self.team_positions[-1]["rect"], self.team_positions[-1], group="team", layer=1)
     
     def _calculate_card_positions(self):
         """
@@ -158,6 +183,23 @@ class DraftingScreen(BaseScreen):
         
         return positions
     
+    def _update_card_positions(self):
+        """
+        Recalculate the available card positions and register them for hit
+        testing, replacing the previous ones.
+        """
+        self.card_positions = self._calculate_card_positions()
+        self.hit_grid.remove_group("available")
+        card_width, card_height = 120, 180
+        for i, position in enumerate(self.card_positions):
+            card_rect = pygame.Rect(
+                position[0] - card_width // 2,
+                position[1] - card_height // 2,
+                card_width,
+                card_height
+            )
+            self.hit_grid.add(card_rect, i, group="available")
+    
     def handle_event(self, event):
         """
         Handle pygame events.
@@ -181,46 +223,37 @@ class DraftingScreen(BaseScreen):
             mouse_pos = pygame.mouse.get_pos()
             
             # First check team positions for cards
-            for i, position in enumerate(self.team_positions):
-                if position["card"] and position["rect"].collidepoint(mouse_pos):
-                    self.dragging_card = position["card"]
-                    self.dragging_from_team = True
-                    self.dragging_from_position = position
-                    
-                    # Calculate offset for smooth dragging
-                    self.drag_offset = (
-                        position["rect"].left - mouse_pos[0],
-                        position["rect"].top - mouse_pos[1]
-                    )
-                    
-                    # Show card description
-                    self.selected_card_index = None  # Clear available card selection
-                    return None
+            position = self.hit_grid.hit(mouse_pos, group="team")
+            if position and position["card"]:
+                self.dragging_card = position["card"]
+                self.dragging_from_team = True
+                self.dragging_from_position = position
+                
+                # Calculate offset for smooth dragging
+                self.drag_offset = (
+                    position["rect"].left - mouse_pos[0],
+                    position["rect"].top - mouse_pos[1]
+                )
+                
+                # Show card description
+                self.selected_card_index = None  # Clear available card selection
+                return None
             
             # If no team card was clicked, check available cards
-            for i, position in enumerate(self.card_positions):
-                if i < len(self.available_cards):
-                    # Create a rect around the card for hit detection
-                    card_width, card_height = 120, 180
-                    card_rect = pygame.Rect(
-                        position[0] - card_width // 2,
-                        position[1] - card_height // 2,
-                        card_width,
-                        card_height
-                    )
-                    
-                    if card_rect.collidepoint(mouse_pos):
-                        self.selected_card_index = i
-                        self.dragging_card = self.available_cards[i]
-                        self.dragging_from_team = False
-                        self.dragging_from_position = None
-                        
-                        # Calculate offset for smooth dragging
-                        self.drag_offset = (
-                            position[0] - card_width // 2 - mouse_pos[0],
-                            position[1] - card_height // 2 - mouse_pos[1]
-                        )
-                        break
+            i = self.hit_grid.hit(mouse_pos, group="available")
+            if i is not None and i < len(self.available_cards):
+                position = self.card_positions[i]
+                card_width, card_height = 120, 180
+                self.selected_card_index = i
+                self.dragging_card = self.available_cards[i]
+                self.dragging_from_team = False
+                self.dragging_from_position = None
+                
+                # Calculate offset for smooth dragging
+                self.drag_offset = (
+                    position[0] - card_width // 2 - mouse_pos[0],
+                    position[1] - card_height // 2 - mouse_pos[1]
+                )
         
         elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:  # Left mouse button released
             if self.dragging_card:
@@ -228,54 +261,58 @@ class DraftingScreen(BaseScreen):
                 
                 # Check if the card was dropped on a team position
                 dropped = False
-                for position in self.team_positions:
-                    if position["rect"].collidepoint(mouse_pos):
-                        # Handle team card movement (swap cards between positions)
-                        if self.dragging_from_team:
-                            # Get the card at the target position (might be None)
-                            target_card = position["card"]
-                            
-                            # Update the target position with the dragged card
-                            position["card"] = self.dragging_card
-                            self.game_state.team_positions[position["row"]][position["index"]] = self.dragging_card
-                            
-                            # Update the source position with the target card (might be None)
-                            if self.dragging_from_position:
-                                self.dragging_from_position["card"] = target_card
-                                self.game_state.team_positions[self.dragging_from_position["row"]][self.dragging_from_position["index"]] = target_card
-                            
-                            dropped = True
-                        # Handle drafting a new card from available cards
+                position = self.hit_grid.hit(mouse_pos, group="team")
+                if position:
+                    # Handle team card movement (swap cards between positions)
+                    if self.dragging_from_team:
+                        # Get the card at the target position (might be None)
+                        target_card = position["card"]
+                        
+                        # Update the target position with the dragged card
+                        position["card"] = self.dragging_card
+                        
+                        # Update the source position with the target card (might be None)
+                        if self.dragging_from_position:
+                            self.dragging_from_position["card"] = target_card
+                            self.game_state.swap_team_positions(
+                                position["row"], position["index"],
+                                self.dragging_from_position["row"], self.dragging_from_position["index"]
+                            )
                         else:
-                            # If there's already a card in this position, swap it back to available
-                            if position["card"]:
-                                self.available_cards.append(position["card"])
-                            
-                            # Place the dragged card in this position
-                            position["card"] = self.dragging_card
-                            
-                            # Update the game state
-                            self.game_state.team_positions[position["row"]][position["index"]] = self.dragging_card
-                            
-                            # Remove the card from available cards
-                            if self.selected_card_index is not None:
-                                self.available_cards.pop(self.selected_card_index)
-                            
-                            # Add to team cards list
-                            self.game_state.add_team_card(self.dragging_card, row=position["row"], index=position["index"])
-                            
-                            # Update game state
-                            self.game_state.draws_remaining -= 1
-                            
-                            # Refresh available cards after each draw
-                            self.refresh_available_cards()
-                            
-                            # Start event phase if no draws remaining
-                            if self.game_state.draws_remaining <= 0:
-                                self.start_event_phase()
-                            
-                            dropped = True
-                        break
+                            self.game_state.set_team_position(position["row"], position["index"], self.dragging_card)
+                        
+                        dropped = True
+                    # Handle drafting a new card from available cards
+                    else:
+                        # If there's already a card in this position, swap it back to available
+                        if position["card"]:
+                            self.available_cards.append(position["card"])
+                            self.draft_sampler.restore(position["card"].card_id)
+                        
+                        # Place the dragged card in this position
+                        position["card"] = self.dragging_card
+                        
+                        # Remove the card from available cards
+                        if self.selected_card_index is not None:
+                            self.available_cards.pop(self.selected_card_index)
+                        
+                        # Add to team cards list and place it in the game state
+                        self.game_state.add_team_card(self.dragging_card, row=position["row"], index=position["index"])
+                        
+                        # Drafted cards are never offered again
+                        self.draft_sampler.remove(self.dragging_card.card_id)
+                        
+                        # Update game state
+                        self.game_state.draws_remaining -= 1
+                        
+                        # Refresh available cards after each draw
+                        self.refresh_available_cards()
+                        
+                        # Start event phase if no draws remaining
+                        if self.game_state.draws_remaining <= 0:
+                            self.start_event_phase()
+                        
+                        dropped = True
                 
                 # If dragging from team and not dropped on a valid position, return to original position
                 if self.dragging_from_team and not dropped and self.dragging_from_position:
@@ -292,18 +329,13 @@ class DraftingScreen(BaseScreen):
                 # Recalculate card positions if needed
                 if dropped and not self.dragging_from_team and len(self.available_cards) < self.cards_to_show:
                     self.cards_to_show = max(1, len(self.available_cards))
-                    self.card_positions = self._calculate_card_positions()
+                    self._update_card_positions()
         
         elif event.type == pygame.MOUSEMOTION:
             # Update hover state for visual feedback
             if self.dragging_card:
                 mouse_pos = pygame.mouse.get_pos()
-                self.hover_position = None
-                
-                for position in self.team_positions:
-                    if position["rect"].collidepoint(mouse_pos):
-                        self.hover_position = position
-                        break
+                self.hover_position = self.hit_grid.hit(mouse_pos, group="team")
         
         return None
     
@@ -319,21 +351,17 @@ class DraftingScreen(BaseScreen):
         
         # Compare team stats against environment card
         self.resolve_event()
+        
+        # Nothing on the overlay changes until the event ends
+        self.event_overlay = self._compose_event_overlay()
     
     def resolve_event(self):
         """
         Resolve the event by comparing team stats against the environment card.
         """
-        # Calculate total team attack and defense
-        team_attack = 0
-        team_defense = 0
-        
-        # Add up stats from all cards in team positions
-        for row in self.game_state.team_positions:
-            for card in self.game_state.team_positions[row]:
-                if card:
-                    team_attack += card.attack
-                    team_defense += card.defense
+        # Team totals are kept up to date by the game state
+        team_attack = self.game_state.team_attack
+        team_defense = self.game_state.team_defense
         
         # Get environment card stats
         env_card = self.game_state.current_environment_card
@@ -370,19 +398,33 @@ class DraftingScreen(BaseScreen):
         # Reset event phase
         self.game_state.event_phase_active = False
         self.game_state.current_environment_card = None
+        self.event_overlay = None
         
         # Advance to next turn
         self.advance_turn()
     
+    def draw_available_cards(self):
+        """
+        Draw a fresh set of cards to offer, weighted by rarity and season,
+        from the cards not yet drafted.
+        
+        Returns:
+            A list of new card instances
+        """
+        # Reweight only when the season has turned, not on every draw
+        if self.draft_season != self.game_state.current_season:
+            self.draft_season = self.game_state.current_season
+            self.draft_sampler.set_weights(season_weights=season_weights(self.draft_season, self.card_registry.by_season))
+        return [record.create() for record in self.draft_sampler.draw(self.draft_size)]
+    
     def refresh_available_cards(self):
         """
         Refresh the available cards to draft.
         """
-        # Create new set of cards
-        self.available_cards = create_team_cards()
-        random.shuffle(self.available_cards)
-        self.cards_to_show = min(3, len(self.available_cards))
-        self.card_positions = self._calculate_card_positions()
+        # Only the cards on offer are created, not the whole catalog
+        self.available_cards = self.draw_available_cards()
+        self.cards_to_show = min(self.draft_size, len(self.available_cards))
+        self._update_card_positions()
     
     def advance_turn(self):
         """
@@ -400,7 +442,7 @@ class DraftingScreen(BaseScreen):
         """
         # Update event result timer if active
         if self.event_result_timer > 0:
-            self.event_result_timer -= pygame.time.get_ticks()
+            self.event_result_timer -= STEP_MS
             if self.event_result_timer <= 0:
                 self.event_result_timer = 0
     
@@ -523,9 +565,11 @@ class DraftingScreen(BaseScreen):
             
             # Draw card in position if there is one and it's not being dragged
             if position["card"] and (not self.dragging_from_team or position != self.dragging_from_position):
-                position["card"].draw(
+                self.card_faces.draw(
                     self.screen, 
-                    (position["rect"].left, position["rect"].top)
+                    position["card"], 
+                    (position["rect"].left, position["rect"].top), 
+                    "slotted"
                 )
         
         # Draw the available cards
@@ -539,7 +583,7 @@ class DraftingScreen(BaseScreen):
                 card_pos = (position[0] - card_width // 2, position[1] - card_height // 2)
                 
                 # Draw the card
-                card.draw(self.screen, card_pos, selected=selected)
+                self.card_faces.draw(self.screen, card, card_pos, "hovered" if selected else "normal")
         
         # Draw the description box
         pygame.draw.rect(self.screen, self.DARK_GRAY, self.description_box_rect, border_radius=10)
@@ -580,7 +624,7 @@ class DraftingScreen(BaseScreen):
                 mouse_pos[0] + self.drag_offset[0],
                 mouse_pos[1] + self.drag_offset[1]
             )
-            self.dragging_card.draw(self.screen, drag_pos)
+            self.card_faces.draw(self.screen, self.dragging_card, drag_pos, "dragging")
     
     def draw_player_hp(self):
         """
@@ -631,14 +675,36 @@ class DraftingScreen(BaseScreen):
         else:
             pygame.draw.polygon(self.screen, color, transformed_points, 2)
     
+    def _on_team_changed(self, game_state):
+        """
+        Called by the game state whenever the team changes.
+        """
+        if self.event_overlay is not None:
+            self.event_overlay = self._compose_event_overlay()
+    
     def draw_event_phase(self):
         """
-        Draw the event phase screen.
+        Draw the event phase screen. Everything but the continue button is
+        composed once per event and blitted as a single overlay.
         """
-        # Draw semi-transparent overlay
+        if self.event_overlay is None:
+            self.event_overlay = self._compose_event_overlay()
+        self.screen.blit(self.event_overlay, (0, 0))
+        
+        # Draw continue button
+        self.continue_button.draw(self.screen)
+    
+    def _compose_event_overlay(self):
+        """
+        Draw the event, the team and environment stats and the result onto
+        a new overlay surface.
+        
+        Returns:
+            A screen-sized surface with per-pixel alpha
+        """
+        # Semi-transparent overlay
         overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 180))  # Semi-transparent black
-        self.screen.blit(overlay, (0, 0))
         
         # Draw event title
         self.draw_text(
@@ -647,7 +713,8 @@ class DraftingScreen(BaseScreen):
             self.WHITE,
             self.width // 2,
             100,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         # Draw environment card
@@ -655,7 +722,7 @@ class DraftingScreen(BaseScreen):
         if env_card:
             card_width, card_height = 120, 180
             card_pos = (self.width // 2 - card_width // 2, 150)
-            env_card.draw(self.screen, card_pos, scale=1.5)
+            env_card.draw(overlay, card_pos, scale=1.5)
             
             # Draw event description
             self.draw_text(
@@ -664,16 +731,18 @@ class DraftingScreen(BaseScreen):
                 self.WHITE,
                 self.width // 2,
                 350,
-                align="center"
+                align="center",
+                surface=overlay
             )
         
         # Draw team stats vs environment stats
-        team_attack, team_defense = self.calculate_team_stats()
+        team_attack = self.game_state.team_attack
+        team_defense = self.game_state.team_defense
         
         # Draw team stats
         team_stats_rect = pygame.Rect(self.width // 4 - 100, 400, 200, 100)
-        pygame.draw.rect(self.screen, (40, 60, 80), team_stats_rect, border_radius=10)
-        pygame.draw.rect(self.screen, (60, 80, 100), team_stats_rect, 2, border_radius=10)
+        pygame.draw.rect(overlay, (40, 60, 80), team_stats_rect, border_radius=10)
+        pygame.draw.rect(overlay, (60, 80, 100), team_stats_rect, 2, border_radius=10)
         
         self.draw_text(
             "Your Team",
@@ -681,7 +750,8 @@ class DraftingScreen(BaseScreen):
             self.WHITE,
             team_stats_rect.centerx,
             team_stats_rect.top + 20,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         self.draw_text(
@@ -690,7 +760,8 @@ class DraftingScreen(BaseScreen):
             (200, 100, 100),
             team_stats_rect.centerx,
             team_stats_rect.top + 50,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         self.draw_text(
@@ -699,13 +770,14 @@ class DraftingScreen(BaseScreen):
             (100, 100, 200),
             team_stats_rect.centerx,
             team_stats_rect.top + 80,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         # Draw environment stats
         env_stats_rect = pygame.Rect(self.width * 3 // 4 - 100, 400, 200, 100)
-        pygame.draw.rect(self.screen, (60, 40, 40), env_stats_rect, border_radius=10)
-        pygame.draw.rect(self.screen, (80, 60, 60), env_stats_rect, 2, border_radius=10)
+        pygame.draw.rect(overlay, (60, 40, 40), env_stats_rect, border_radius=10)
+        pygame.draw.rect(overlay, (80, 60, 60), env_stats_rect, 2, border_radius=10)
         
         self.draw_text(
             env_card.name,
@@ -713,7 +785,8 @@ class DraftingScreen(BaseScreen):
             self.WHITE,
             env_stats_rect.centerx,
             env_stats_rect.top + 20,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         self.draw_text(
@@ -722,7 +795,8 @@ class DraftingScreen(BaseScreen):
             (200, 100, 100),
             env_stats_rect.centerx,
             env_stats_rect.top + 50,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         self.draw_text(
@@ -731,7 +805,8 @@ class DraftingScreen(BaseScreen):
             (100, 100, 200),
             env_stats_rect.centerx,
             env_stats_rect.top + 80,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         # Draw comparison arrows
@@ -746,7 +821,8 @@ class DraftingScreen(BaseScreen):
             attack_color,
             self.width // 2,
             arrow_y,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         # Defense comparison (team defense vs environment attack)
@@ -759,7 +835,8 @@ class DraftingScreen(BaseScreen):
             defense_color,
             self.width // 2,
             arrow_y + 30,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
         # Draw result message
@@ -769,30 +846,11 @@ class DraftingScreen(BaseScreen):
             self.WHITE,
             self.width // 2,
             520,
-            align="center"
+            align="center",
+            surface=overlay
         )
         
-        # Draw continue button
-        self.continue_button.draw(self.screen)
-    
-    def calculate_team_stats(self):
-        """
-        Calculate the total attack and defense stats of the team.
-        
-        Returns:
-            Tuple of (attack, defense)
-        """
-        team_attack = 0
-        team_defense = 0
-        
-        # Add up stats from all cards in team positions
-        for row in self.game_state.team_positions:
-            for card in self.game_state.team_positions[row]:
-                if card:
-                    team_attack += card.attack
-                    team_defense += card.defense
-        
-        return team_attack, team_defense
+        return overlay
     
     def _draw_card_description(self, card):
         """
@@ -0,0 +1,112 @@
+import gc
+
+from src.game_state import GameState
+
+
+class FakeCard:
+    def __init__(self, card_id, attack, defense):
+        self.card_id = card_id
+        self.attack = attack
+        self.defense = defense
+
+
+def recount(state):
+    cards = [card for row in state.team_positions.values() for card in row if card]
+    return sum(card.attack for card in cards), sum(card.defense for card in cards)
+
+
+def test_totals_follow_placements():
+    state = GameState()
+    crow, raven, magpie = FakeCard(0, 3, 1), FakeCard(1, 2, 4), FakeCard(2, 1, 1)
+    state.add_team_card(crow, row="front", index=0)
+    state.add_team_card(raven, row="back", index=1)
+    assert (state.team_attack, state.team_defense) == (5, 5)
+
+    # Replacing a card takes its stats off the team
+    state.add_team_card(magpie, row="front", index=0)
+    assert (state.team_attack, state.team_defense) == (3, 5)
+
+    # Moving a card counts it once
+    state.set_team_position("front", 2, raven)
+    assert state.team_positions["back"][1] is None
+    assert (state.team_attack, state.team_defense) == (3, 5)
+
+    state.swap_team_positions("front", 0, "back", 0)
+    state.remove_team_card(raven)
+    assert (state.team_attack, state.team_defense) == recount(state) == (1, 1)
+
+
+def test_recalculate_after_stat_change():
+    state = GameState()
+    crow = FakeCard(0, 3, 1)
+    state.add_team_card(crow, row="front", index=1)
+    crow.attack = 7
+    state.recalculate_team_stats()
+    assert (state.team_attack, state.team_defense) == (7, 1)
+
+
+def test_observers_hear_team_changes():
+    state = GameState()
+    seen = []
+
+    def observer(game_state):
+        seen.append((game_state.team_attack, game_state.team_defense))
+
+    state.add_team_observer(observer)
+    state.add_team_card(FakeCard(0, 3, 1), row="front", index=0)
+    state.swap_team_positions("front", 0, "front", 1)
+    state.remove_team_observer(observer)
+    state.add_team_card(FakeCard(1, 2, 2), row="back", index=0)
+    assert seen == [(3, 1), (3, 1)]
+
+
+def test_discarded_observers_are_dropped():
+    class Screen:
+        def __init__(self, game_state, seen):
+            self.seen = seen
+            game_state.add_team_observer(self.on_team_changed)
+
+        def on_team_changed(self, game_state):
+            self.seen.append(self)
+
+    state = GameState()
+    seen = []
+    kept = Screen(state, seen)
+    Screen(state, seen)
+    gc.collect()
+    state.add_team_card(FakeCard(0, 3, 1), row="front", index=0)
+    assert seen == [kept]
+    assert len(state.team_observers) == 1
+
+
+def test_copies_of_one_card_are_separate_members():
+    state = GameState()
+    crow, copy = FakeCard(0, 3, 1), FakeCard(0, 3, 1)
+    state.add_team_card(crow, row="front", index=0)
+    state.add_team_card(copy, row="front", index=1)
+    assert list(state.team_cards) == [crow, copy]
+    assert state.find_team_slot(crow) == ("front", 0)
+    assert state.find_team_slot(copy) == ("front", 1)
+
+    state.remove_team_card(crow)
+    assert not state.has_team_card(crow)
+    assert state.has_team_card(copy)
+    assert state.team_positions["front"] == [None, copy, None]
+    assert (state.team_attack, state.team_defense) == (3, 1)
+
+
+def test_slots_follow_moves_and_swaps():
+    state = GameState()
+    crow, raven = FakeCard(0, 3, 1), FakeCard(1, 2, 4)
+    state.add_team_card(crow, row="front", index=0)
+    state.add_team_card(raven, row="back", index=0)
+    state.swap_team_positions("front", 0, "back", 0)
+    assert state.find_team_slot(crow) == ("back", 0)
+    assert state.find_team_slot(raven) == ("front", 0)
+
+    # A card pushed out of its position leaves the team
+    magpie = FakeCard(2, 1, 1)
+    state.add_team_card(magpie, row="back", index=0)
+    assert list(state.team_cards) == [raven, magpie]
+    assert state.find_team_slot(crow) is None
+    assert len(state.team_cards) == 2
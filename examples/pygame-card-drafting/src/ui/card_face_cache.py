@@ -0,0 +1,105 @@
+from collections import OrderedDict
+
+import pygame
+
+# Size of a card face as drawn by Card.draw at scale 1
+CARD_SIZE = (120, 180)
+
+# Room around the face for outlines and glows drawn outside the card
+FACE_PADDING = 12
+
+# The ways a card is shown, and the Card.draw arguments for each
+CARD_STATES = {
+    "normal": {},
+    "hovered": {"selected": True},
+    "dragging": {},
+    "slotted": {},
+}
+
+
+def card_signature(card):
+    """
+    Get the values a card's face is drawn from. A change in any of them means
+    the face has to be drawn again.
+    """
+    return (card.name, card.cost, card.attack, card.defense,
+            getattr(card, "description", None), getattr(card, "rarity", None))
+
+
+class CardFaceCache:
+    """
+    Pre-rendered card faces, one per card and state.
+
+    Drawing a card builds its frame, art and text from scratch; a face drawn
+    once to its own surface is reused with a single blit until the card's
+    stats change.
+    """
+
+    def __init__(self, max_entries=64):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Most faces to keep; the least recently used one is
+                dropped when a new one would go over
+        """
+        self.max_entries = max_entries
+        self.faces = OrderedDict()  # (id(card), state) -> (card, signature, surface)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, card, state="normal"):
+        """
+        Get a card's face, drawing it only if it isn't cached or the card has
+        changed.
+
+        Args:
+            card: The card
+            state: One of CARD_STATES
+
+        Returns:
+            The face surface, padded by FACE_PADDING on every side
+        """
+        key = (id(card), state)
+        signature = card_signature(card)
+        entry = self.faces.get(key)
+        if entry is not None and entry[0] is card and entry[1] == signature:
+            self.hits += 1
+            self.faces.move_to_end(key)
+            return entry[2]
+
+        self.misses += 1
+        width, height = CARD_SIZE
+        surface = pygame.Surface((width + 2 * FACE_PADDING, height + 2 * FACE_PADDING), pygame.SRCALPHA)
+        card.draw(surface, (FACE_PADDING, FACE_PADDING), **CARD_STATES[state])
+        self.faces[key] = (card, signature, surface)
+        self.faces.move_to_end(key)
+        if len(self.faces) > self.max_entries:
+            self.faces.popitem(last=False)
+        return surface
+
+    def draw(self, surface, card, pos, state="normal"):
+        """
+        Draw a card's face, as card.draw(surface, pos) would.
+
+        Args:
+            surface: The surface to draw on
+            card: The card
+            pos: The top-left position of the card
+            state: One of CARD_STATES
+
+        Returns:
+            The area drawn over
+        """
+        face = self.get(card, state)
+        return surface.blit(face, (pos[0] - FACE_PADDING, pos[1] - FACE_PADDING))
+
+    def invalidate(self, card=None):
+        """
+        Drop the cached faces of a card, or of every card.
+        """
+        if card is None:
+            self.faces.clear()
+            return
+        for state in CARD_STATES:
+            self.faces.pop((id(card), state), None)
@@ -0,0 +1,92 @@
+class HitGrid:
+    """
+    A uniform grid over the screen for finding what is under the mouse.
+
+    Targets are registered once with their rect, instead of rects being built
+    and tested one by one on every event. Each grid cell lists the targets
+    overlapping it, so a lookup only tests the few targets in one cell.
+    """
+
+    def __init__(self, width, height, cell_size=64):
+        """
+        Initialize an empty grid.
+
+        Args:
+            width, height: Size of the area covered, usually the screen
+            cell_size: Width and height of a grid cell in pixels
+        """
+        self.cell_size = cell_size
+        self.columns = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+        self.cells = {}
+        self.entries = {}  # Registration order -> (rect, target, group, layer)
+        self.order = 0
+
+    def _cells(self, rect):
+        left = max(0, rect.left // self.cell_size)
+        right = min(self.columns - 1, (rect.right - 1) // self.cell_size)
+        top = max(0, rect.top // self.cell_size)
+        bottom = min(self.rows - 1, (rect.bottom - 1) // self.cell_size)
+        for row in range(top, bottom + 1):
+            for column in range(left, right + 1):
+                yield row, column
+
+    def add(self, rect, target, group=None, layer=0):
+        """
+        Register a target.
+
+        Args:
+            rect: The pygame.Rect the target covers
+            target: What a hit returns, e.g. a position dict or an index
+            group: Optional name for removing or looking up targets together
+            layer: Targets on higher layers are on top; within a layer, the
+                one added last is on top, as when drawn in order
+        """
+        self.order += 1
+        self.entries[self.order] = (rect.copy(), target, group, layer)
+        for cell in self._cells(rect):
+            self.cells.setdefault(cell, []).append(self.order)
+
+    def remove_group(self, group):
+        """
+        Unregister every target in a group.
+        """
+        removed = {order for order, entry in self.entries.items() if entry[2] == group}
+        if not removed:
+            return
+        for order in removed:
+            del self.entries[order]
+        for cell, orders in list(self.cells.items()):
+            kept = [order for order in orders if order not in removed]
+            if kept:
+                self.cells[cell] = kept
+            else:
+                del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+
+    def hit(self, point, group=None):
+        """
+        Find the topmost target under a point.
+
+        Args:
+            point: The (x, y) position, e.g. of the mouse
+            group: Only consider targets in this group
+
+        Returns:
+            The target, or None if there is none under the point
+        """
+        x, y = point
+        orders = self.cells.get((y // self.cell_size, x // self.cell_size))
+        if not orders:
+            return None
+        best = None
+        for order in orders:
+            rect, target, target_group, layer = self.entries[order]
+            if group is not None and target_group != group:
+                continue
+            if rect.collidepoint(x, y) and (best is None or (layer, order) > best[0]):
+                best = ((layer, order), target)
+        return best[1] if best else None
@@ -0,0 +1,81 @@
+import pygame
+
+from src.ui.card_face_cache import CARD_STATES, FACE_PADDING, CardFaceCache
+
+
+class FakeCard:
+    """
+    Stands in for a Card, counting how often it is drawn.
+    """
+
+    def __init__(self, name="Crow", cost=1, attack=2, defense=3):
+        self.name = name
+        self.cost = cost
+        self.attack = attack
+        self.defense = defense
+        self.draws = []
+
+    def draw(self, surface, pos, selected=False):
+        self.draws.append(selected)
+        pygame.draw.rect(surface, (200, 50, 50), (pos[0], pos[1], 10, 10))
+
+
+def test_face_is_drawn_once_per_state():
+    cache = CardFaceCache()
+    card = FakeCard()
+    face = cache.get(card)
+    assert cache.get(card) is face
+    hovered = cache.get(card, "hovered")
+    assert hovered is not face
+    assert card.draws == [False, True]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_stat_change_redraws():
+    cache = CardFaceCache()
+    card = FakeCard()
+    face = cache.get(card)
+    card.attack += 1
+    assert cache.get(card) is not face
+    assert len(card.draws) == 2
+
+
+def test_equal_cards_get_their_own_faces():
+    cache = CardFaceCache()
+    card, copy = FakeCard(), FakeCard()
+    cache.get(card)
+    cache.get(copy)
+    assert len(card.draws) == len(copy.draws) == 1
+
+
+def test_least_recently_used_is_dropped():
+    cache = CardFaceCache(max_entries=2)
+    cards = [FakeCard(name) for name in "abc"]
+    cache.get(cards[0])
+    cache.get(cards[1])
+    cache.get(cards[0])
+    cache.get(cards[2])
+    assert len(cache.faces) == 2
+    cache.get(cards[0])
+    cache.get(cards[1])
+    assert [len(card.draws) for card in cards] == [1, 2, 1]
+
+
+def test_invalidate():
+    cache = CardFaceCache()
+    card, other = FakeCard(), FakeCard("Raven")
+    for state in CARD_STATES:
+        cache.get(card, state)
+    cache.get(other)
+    cache.invalidate(card)
+    assert len(cache.faces) == 1
+    cache.invalidate()
+    assert not cache.faces
+
+
+def test_draw_blits_at_card_position():
+    cache = CardFaceCache()
+    surface = pygame.Surface((300, 300))
+    area = cache.draw(surface, FakeCard(), (50, 60))
+    assert area.topleft == (50 - FACE_PADDING, 60 - FACE_PADDING)
+    assert surface.get_at((52, 62))[:3] == (200, 50, 50)
@@ -0,0 +1,57 @@
+import random
+
+import pygame
+
+from src.ui.hit_grid import HitGrid
+
+
+def test_hit_finds_target_under_point():
+    grid = HitGrid(800, 600)
+    grid.add(pygame.Rect(100, 100, 120, 180), "card")
+    grid.add(pygame.Rect(400, 300, 50, 50), "button")
+    assert grid.hit((150, 200)) == "card"
+    assert grid.hit((425, 325)) == "button"
+    assert grid.hit((219, 279)) == "card"
+    assert grid.hit((220, 200)) is None
+    assert grid.hit((10, 10)) is None
+
+
+def test_topmost_target_wins():
+    grid = HitGrid(800, 600, cell_size=32)
+    grid.add(pygame.Rect(0, 0, 200, 200), "panel", layer=0)
+    grid.add(pygame.Rect(50, 50, 50, 50), "slot", layer=0)
+    grid.add(pygame.Rect(40, 40, 20, 20), "popup", layer=1)
+    grid.add(pygame.Rect(60, 60, 10, 10), "under", layer=0)
+    assert grid.hit((45, 45)) == "popup"
+    assert grid.hit((55, 55)) == "popup"
+    assert grid.hit((65, 65)) == "under"  # Added last on the same layer
+    assert grid.hit((90, 90)) == "slot"
+    assert grid.hit((150, 150)) == "panel"
+
+
+def test_groups():
+    grid = HitGrid(800, 600)
+    grid.add(pygame.Rect(0, 0, 100, 100), "offer", group="offers")
+    grid.add(pygame.Rect(0, 0, 100, 100), "slot", group="slots")
+    assert grid.hit((50, 50)) == "slot"
+    assert grid.hit((50, 50), group="offers") == "offer"
+    grid.remove_group("slots")
+    assert grid.hit((50, 50)) == "offer"
+    grid.remove_group("offers")
+    assert grid.hit((50, 50)) is None
+    assert not grid.cells
+
+
+def test_matches_testing_every_rect():
+    rng = random.Random(5)
+    grid = HitGrid(640, 480, cell_size=48)
+    targets = []
+    for index in range(60):
+        rect = pygame.Rect(rng.randrange(-20, 620), rng.randrange(-20, 460), rng.randrange(1, 150), rng.randrange(1, 150))
+        layer = rng.randrange(3)
+        grid.add(rect, index, layer=layer)
+        targets.append((layer, index, rect))
+    for _ in range(2000):
+        point = (rng.randrange(640), rng.randrange(480))
+        hits = [(layer, index) for layer, index, rect in targets if rect.collidepoint(point)]
+        assert grid.hit(point) == (max(hits)[1] if hits else None)
@@ -0,0 +1,55 @@
+from src.ui.text_cache import TextCache
+
+
+class FakeFont:
+    """
+    Stands in for a pygame font, counting what it renders.
+    """
+
+    def __init__(self):
+        self.rendered = []
+
+    def render(self, text, antialias, color):
+        self.rendered.append(text)
+        return object()
+
+
+def test_hits_reuse_the_surface():
+    cache = TextCache()
+    font = FakeFont()
+    surface = cache.render(font, "Turn 1", (255, 255, 255))
+    assert cache.render(font, "Turn 1", [255, 255, 255]) is surface
+    assert font.rendered == ["Turn 1"]
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_key_covers_font_color_and_antialias():
+    cache = TextCache()
+    font, other_font = FakeFont(), FakeFont()
+    cache.render(font, "Attack", (255, 0, 0))
+    cache.render(font, "Attack", (0, 255, 0))
+    cache.render(font, "Attack", (255, 0, 0), antialias=False)
+    cache.render(other_font, "Attack", (255, 0, 0))
+    assert cache.misses == 4
+    assert cache.hits == 0
+
+
+def test_least_recently_used_is_dropped():
+    cache = TextCache(max_entries=2)
+    font = FakeFont()
+    cache.render(font, "a", (0, 0, 0))
+    cache.render(font, "b", (0, 0, 0))
+    cache.render(font, "a", (0, 0, 0))  # "b" is now the least recently used
+    cache.render(font, "c", (0, 0, 0))
+    assert len(cache.surfaces) == 2
+    cache.render(font, "a", (0, 0, 0))
+    cache.render(font, "b", (0, 0, 0))
+    assert font.rendered == ["a", "b", "c", "b"]
+
+
+def test_clear_resets_counters():
+    cache = TextCache()
+    font = FakeFont()
+    cache.render(font, "a", (0, 0, 0))
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
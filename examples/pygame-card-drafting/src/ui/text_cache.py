@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+class TextCache:
+    """
+    A least-recently-used cache of rendered text surfaces.
+
+    Most text on a screen (titles, labels, stats) is the same from one frame
+    to the next, and rendering it with a font is far slower than blitting a
+    surface that was rendered before.
+    """
+
+    def __init__(self, max_entries=512):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Most surfaces to keep; the least recently used one is
+                dropped when a new one would go over
+        """
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Get the surface for some text, rendering it only if it isn't cached.
+
+        Args:
+            font: The font to render with
+            text: The text to render
+            color: The text color
+            antialias: Whether to smooth the edges of the text
+
+        Returns:
+            The rendered surface. It is shared, so it must not be drawn on.
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """
+        Drop every cached surface and reset the counters.
+        """
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Get the cache's counters.
+
+        Returns:
+            A dict of hits, misses, hit_rate (0 to 1) and entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.surfaces),
+        }
+
+
+_text_cache = None
+
+
+def get_text_cache():
+    """
+    Get the text cache shared by every screen, creating it on first use.
+    """
+    global _text_cache
+    if _text_cache is None:
+        _text_cache = TextCache()
+    return _text_cache
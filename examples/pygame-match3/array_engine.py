@@ -0,0 +1,404 @@
+import random
+
+import numpy as np
+
+from board_engine import EMPTY, GEM_TYPES, SPECIAL_CLEAR_POINTS, SPECIAL_TYPES, ClearPlan, plan_specials, score_matches
+
+
+class ArrayBoardEngine:
+    """
+    NumPy-backed board logic for large match-3 boards.
+
+    A drop-in alternative to BoardEngine with the same methods and the same
+    results, but every whole-board operation is vectorized: columns are
+    compacted in one pass, new gems are generated in bulk and runs are found
+    with array slicing. Meant for "mega board" modes up to 64x64, where the
+    per-cell Python loops of the bitboard engine stop keeping up.
+    """
+
+    def __init__(self, rows=8, cols=8, gem_types=GEM_TYPES, seed=None):
+        """
+        Initialize an empty board.
+
+        Args:
+            rows: Number of rows on the board
+            cols: Number of columns on the board
+            gem_types: Names of the gem types, indexed by type id
+            seed: Seed for the board's random generator, or None for a random one
+        """
+        self.rows = rows
+        self.cols = cols
+        self.gem_types = tuple(gem_types)
+        self.grid = np.full((rows, cols), EMPTY, dtype=np.int8)
+        self.specials = np.zeros((rows, cols), dtype=np.int8)  # Codes as in BoardEngine
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = np.random.default_rng(self.seed)
+
+    def copy(self):
+        """
+        Make an independent copy of the board, including its generator state.
+        """
+        clone = ArrayBoardEngine.__new__(ArrayBoardEngine)
+        clone.__dict__.update(self.__dict__)
+        clone.grid = self.grid.copy()
+        clone.specials = self.specials.copy()
+        clone.rng = np.random.default_rng()
+        clone.rng.bit_generator.state = self.rng.bit_generator.state
+        return clone
+
+    def reseed(self, seed):
+        """
+        Restart the board's generator from a new seed.
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def get(self, row, col):
+        """
+        Get the gem type id at a cell, or EMPTY.
+        """
+        return int(self.grid[row, col])
+
+    def get_type(self, row, col):
+        """
+        Get the gem type name at a cell, or None if the cell is empty.
+        """
+        gem = self.grid[row, col]
+        return None if gem == EMPTY else self.gem_types[gem]
+
+    def type_id(self, gem_type):
+        return self.gem_types.index(gem_type)
+
+    def get_special(self, row, col):
+        """
+        Get the special type name at a cell, or None if it holds a plain gem.
+        """
+        code = self.specials[row, col]
+        return SPECIAL_TYPES[code - 1] if code else None
+
+    def set(self, row, col, gem, special=0):
+        self.grid[row, col] = gem
+        self.specials[row, col] = special
+
+    def clear(self, row, col):
+        self.grid[row, col] = EMPTY
+        self.specials[row, col] = 0
+
+    def swap(self, row1, col1, row2, col2):
+        """
+        Swap the gems at two cells.
+        """
+        for grid in (self.grid, self.specials):
+            grid[row1, col1], grid[row2, col2] = grid[row2, col2], grid[row1, col1]
+
+    def shuffle(self):
+        """
+        Randomly rearrange the gems already on the board. Special gems keep
+        their specials.
+        """
+        order = self.rng.permutation(self.grid.size)
+        self.grid = self.grid.reshape(-1)[order].reshape(self.grid.shape)
+        self.specials = self.specials.reshape(-1)[order].reshape(self.specials.shape)
+
+    def mark_all_dirty(self):
+        # Every scan is a full vectorized scan, so there is nothing to track
+        pass
+
+    def fill_initial(self):
+        """
+        Fill the board with random gems, avoiding any initial matches.
+
+        The board is filled in bulk, then only the gems that form runs are
+        re-rolled until none remain.
+        """
+        n_types = len(self.gem_types)
+        self.grid[:] = self.rng.integers(0, n_types, size=self.grid.shape)
+        matched = self._match_mask()
+        while matched.any():
+            self.grid[matched] = self.rng.integers(0, n_types, size=int(matched.sum()))
+            matched = self._match_mask()
+
+    def _run_masks(self):
+        # Boolean masks of cells in horizontal and vertical runs of three or more
+        grid = self.grid
+        filled = grid != EMPTY
+
+        horizontal = np.zeros(grid.shape, dtype=bool)
+        run3 = filled[:, :-2] & (grid[:, :-2] == grid[:, 1:-1]) & (grid[:, 1:-1] == grid[:, 2:])
+        horizontal[:, :-2] |= run3
+        horizontal[:, 1:-1] |= run3
+        horizontal[:, 2:] |= run3
+
+        vertical = np.zeros(grid.shape, dtype=bool)
+        run3 = filled[:-2, :] & (grid[:-2, :] == grid[1:-1, :]) & (grid[1:-1, :] == grid[2:, :])
+        vertical[:-2, :] |= run3
+        vertical[1:-1, :] |= run3
+        vertical[2:, :] |= run3
+
+        return horizontal, vertical
+
+    def _match_mask(self):
+        horizontal, vertical = self._run_masks()
+        return horizontal | vertical
+
+    @staticmethod
+    def _runs(grid, covered):
+        # Split a mask of matched cells into (row, start_col, length) runs along
+        # each row. Neighbouring runs of different gems are kept apart.
+        continues = np.zeros(covered.shape, dtype=bool)
+        continues[:, 1:] = covered[:, 1:] & covered[:, :-1] & (grid[:, 1:] == grid[:, :-1])
+        starts = covered & ~continues
+        ends = covered.copy()
+        ends[:, :-1] &= ~continues[:, 1:]
+
+        start_rows, start_cols = np.nonzero(starts)
+        _, end_cols = np.nonzero(ends)
+        return zip(start_rows.tolist(), start_cols.tolist(), (end_cols - start_cols + 1).tolist())
+
+    def find_matches(self, full=False):
+        """
+        Find all horizontal and vertical runs of three or more identical gems.
+
+        Args:
+            full: Accepted for compatibility with BoardEngine; every scan is full
+
+        Returns:
+            A list of matches, each a list of (row, col) tuples, in the same
+            order as BoardEngine.find_matches
+        """
+        horizontal, vertical = self._run_masks()
+        matches = []
+        if horizontal.any():
+            for row, col, length in self._runs(self.grid, horizontal):
+                matches.append([(row, col + i) for i in range(length)])
+        if vertical.any():
+            for col, row, length in self._runs(self.grid.T, vertical.T):
+                matches.append([(row + i, col) for i in range(length)])
+        return matches
+
+    def plan_clear(self, matches, swapped=(), create_specials=True):
+        """
+        Work out everything one cascade step clears, without changing the board.
+
+        Follows the same rules as BoardEngine.plan_clear, with each special's
+        effect written into a boolean mask of the cleared cells.
+
+        Returns:
+            A ClearPlan, to be applied with apply_clear
+        """
+        matched = np.zeros(self.grid.shape, dtype=bool)
+        for match in matches:
+            rows, cols = zip(*match)
+            matched[list(rows), list(cols)] = True
+
+        created = {}
+        if create_specials:
+            fired = {(row, col) for match in matches for row, col in match if self.specials[row, col]}
+            created = plan_specials(matches, swapped, fired)
+
+        cleared = matched.copy()
+        fired = np.zeros(self.grid.shape, dtype=bool)
+        triggered = []
+        frontier = cleared & (self.specials != 0)
+        while frontier.any():
+            fired |= frontier
+            for row, col in zip(*np.nonzero(frontier)):
+                row, col = int(row), int(col)
+                special = SPECIAL_TYPES[self.specials[row, col] - 1]
+                triggered.append((row, col, special))
+                if special == "line":
+                    cleared[row, :] = True
+                elif special == "bomb":
+                    cleared[max(row - 1, 0):row + 2, max(col - 1, 0):col + 2] = True
+                else:
+                    cleared |= self.grid == self.grid[row, col]
+            cleared &= self.grid != EMPTY
+            frontier = cleared & (self.specials != 0) & ~fired
+
+        # New specials stay on the board
+        for row, col in created:
+            cleared[row, col] = False
+
+        rows, cols = np.nonzero(cleared)
+        cells = list(zip(rows.tolist(), cols.tolist()))
+        extra = int((cleared & ~matched).sum())
+        points = score_matches(matches) + extra * SPECIAL_CLEAR_POINTS
+        created = [(row, col, special) for (row, col), special in sorted(created.items())]
+        return ClearPlan(cells, created, triggered, points, cleared)
+
+    def apply_clear(self, plan):
+        """
+        Apply a ClearPlan: empty every cleared cell in one batch and place the
+        specials it creates.
+
+        Returns:
+            The number of cells cleared
+        """
+        self.grid[plan.mask] = EMPTY
+        self.specials[plan.mask] = 0
+        for row, col, special in plan.created:
+            self.specials[row, col] = SPECIAL_TYPES.index(special) + 1
+        return len(plan.cleared)
+
+    def apply_gravity(self):
+        """
+        Drop gems down into empty cells below them, compacting every column
+        in one vectorized pass.
+
+        Returns:
+            A list of (from_row, to_row, col) moves, column by column from the
+            bottom up, as BoardEngine.apply_gravity returns them
+        """
+        filled = self.grid != EMPTY
+
+        # A stable sort on "is filled" moves the empty cells to the top of each
+        # column and keeps the gems in their original order below them
+        order = np.argsort(filled, axis=0, kind="stable")
+        self.grid = np.take_along_axis(self.grid, order, axis=0)
+        self.specials = np.take_along_axis(self.specials, order, axis=0)
+
+        moved = (order != np.arange(self.rows)[:, None]) & (self.grid != EMPTY)
+        cols, to_rows = np.nonzero(moved.T)
+        from_rows = order[to_rows, cols]
+        moves = list(zip(from_rows.tolist(), to_rows.tolist(), cols.tolist()))
+        moves.sort(key=lambda move: (move[2], -move[1]))
+        return moves
+
+    def refill(self):
+        """
+        Fill every empty cell with a random gem, generated in bulk.
+
+        Returns:
+            A list of (row, col, gem_type_id) for the new gems, column by column
+        """
+        cols, rows = np.nonzero(self.grid.T == EMPTY)
+        if not len(rows):
+            return []
+        gems = self.rng.integers(0, len(self.gem_types), size=len(rows))
+        self.grid[rows, cols] = gems
+        return list(zip(rows.tolist(), cols.tolist(), gems.tolist()))
+
+
+def _shifted(cells, d_row, d_col):
+    # The neighbour of every cell at (d_row, d_col), False off the board
+    shifted = np.zeros_like(cells)
+    rows, cols = cells.shape
+    shifted[max(-d_row, 0):rows - max(d_row, 0), max(-d_col, 0):cols - max(d_col, 0)] = \
+        cells[max(d_row, 0):rows + min(d_row, 0), max(d_col, 0):cols + min(d_col, 0)]
+    return shifted
+
+
+class ArrayMoveIndex:
+    """
+    Index of every swap that would produce a match, for an ArrayBoardEngine.
+
+    The same rules and methods as board_engine.MoveIndex, with the valid
+    swaps kept as two boolean arrays of anchor cells and worked out with
+    array shifts instead of bitboard shifts.
+    """
+
+    def __init__(self, engine):
+        """
+        Initialize the index for a board.
+
+        Args:
+            engine: The ArrayBoardEngine to index
+        """
+        self.engine = engine
+        self.indexed = None  # The grid the index was built from
+        self.right_moves = np.zeros(engine.grid.shape, dtype=bool)
+        self.down_moves = np.zeros(engine.grid.shape, dtype=bool)
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Re-evaluate every swap on the board.
+        """
+        grid = self.engine.grid
+        self.indexed = grid.copy()
+        occupied = grid != EMPTY
+        right_moves = np.zeros(grid.shape, dtype=bool)
+        down_moves = np.zeros(grid.shape, dtype=bool)
+
+        for gem in range(len(self.engine.gem_types)):
+            plane = grid == gem
+            if not plane.any():
+                continue
+            west, west2 = _shifted(plane, 0, -1), _shifted(plane, 0, -2)
+            east, east2 = _shifted(plane, 0, 1), _shifted(plane, 0, 2)
+            north, north2 = _shifted(plane, -1, 0), _shifted(plane, -2, 0)
+            south, south2 = _shifted(plane, 1, 0), _shifted(plane, 2, 0)
+
+            # Cells whose neighbours complete a run of this gem type
+            left = west & west2
+            right = east & east2
+            up = north & north2
+            down = south & south2
+            horizontal = left | (west & east) | right
+            vertical = up | (north & south) | down
+
+            # Cells another gem type could give this gem up to
+            others = occupied & ~plane
+
+            right_moves |= (left | vertical) & others & east                              # Moves left
+            right_moves |= _shifted((right | vertical) & others & west, 0, 1)             # Moves right
+            down_moves |= (horizontal | up) & others & south                              # Moves up
+            down_moves |= _shifted((horizontal | down) & others & north, 1, 0)            # Moves down
+
+        self.right_moves = right_moves
+        self.down_moves = down_moves
+
+    def update(self):
+        """
+        Bring the index up to date if the board changed since the last update.
+        """
+        if not np.array_equal(self.indexed, self.engine.grid):
+            self.rebuild()
+
+    @property
+    def moves(self):
+        """
+        The set of valid swaps, as (row1, col1, row2, col2) tuples with cell 1
+        left of or above cell 2.
+        """
+        moves = set()
+        for anchors, d_row, d_col in ((self.right_moves, 0, 1), (self.down_moves, 1, 0)):
+            rows, cols = np.nonzero(anchors)
+            moves.update((row, col, row + d_row, col + d_col) for row, col in zip(rows.tolist(), cols.tolist()))
+        return moves
+
+    def is_valid(self, row1, col1, row2, col2):
+        """
+        Check whether swapping two adjacent cells would produce a match.
+        """
+        if (row2, col2) < (row1, col1):
+            row1, col1, row2, col2 = row2, col2, row1, col1
+        if row1 == row2:
+            return bool(self.right_moves[row1, col1])
+        return bool(self.down_moves[row1, col1])
+
+    def has_moves(self):
+        return bool(self.right_moves.any() or self.down_moves.any())
+
+    def hint(self):
+        """
+        Get one valid swap, or None if the board is deadlocked.
+        """
+        moves = self.moves
+        return min(moves) if moves else None
+
+    def reshuffle(self, max_attempts=100):
+        """
+        Shuffle a deadlocked board until it has no matches and at least one move.
+
+        Returns:
+            True if a playable arrangement was found
+        """
+        engine = self.engine
+        for _ in range(max_attempts):
+            engine.shuffle()
+            if not engine.find_matches(full=True):
+                self.rebuild()
+                if self.has_moves():
+                    return True
+        self.rebuild()
+        return False
@@ -0,0 +1,251 @@
+"""
+Benchmarks for the hot paths of Gem Fusion Quest.
+
+Times the board logic (find_matches, apply_gravity, refill) across board
+sizes and gem counts, and the rendering paths (Gem.draw, Board.draw,
+Board.refill_board) on a headless display. Results are written as JSON and
+can be compared against a stored baseline, failing when any path gets slower
+by more than a threshold.
+
+Fewer gem types make denser boards: more runs to find, more cells to clear
+and more gems to drop and refill.
+
+Usage:
+    python benchmark.py --json baseline.json
+    python benchmark.py --baseline baseline.json --threshold 10
+    python benchmark.py --sizes 8 64 --gems 3 6 --numpy --only find_matches
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import namedtuple
+
+# Rendering is benchmarked without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from board_engine import BoardEngine, GEM_TYPES
+from profiler import percentile
+
+# A benchmark
+#   name: Unique name, used to match results against a baseline
+#   params: Dict describing the case, copied into the results
+#   setup: Called before each sample, untimed; returns the argument for run
+#   run: The timed operation
+Benchmark = namedtuple("Benchmark", ["name", "params", "setup", "run"])
+
+
+def random_board(engine_class, size, gems, seed):
+    """
+    Make a board filled with uniformly random gems, matches and all.
+    """
+    engine = engine_class(size, size, GEM_TYPES[:gems], seed=seed)
+    rng = random.Random(seed)
+    for row in range(size):
+        for col in range(size):
+            engine.set(row, col, rng.randrange(gems))
+    engine.mark_all_dirty()
+    return engine
+
+
+def cleared_board(engine_class, size, gems, seed):
+    """
+    Make a random board with every match cleared, ready for gravity.
+    """
+    engine = random_board(engine_class, size, gems, seed)
+    matches = engine.find_matches(full=True)
+    if matches:
+        engine.apply_clear(engine.plan_clear(matches))
+    return engine
+
+
+def engine_benchmarks(engine_class, sizes, gem_counts):
+    """
+    Build the board-logic benchmarks for one engine class.
+    """
+    benchmarks = []
+    label = engine_class.__name__
+    for size in sizes:
+        for gems in gem_counts:
+            params = {"engine": label, "size": size, "gems": gems}
+            suffix = f"{label}/{size}x{size}/{gems}gems"
+
+            full = random_board(engine_class, size, gems, seed=size * 100 + gems)
+            benchmarks.append(Benchmark(
+                f"find_matches/{suffix}", params,
+                full.copy, lambda engine: engine.find_matches()))
+
+            holes = cleared_board(engine_class, size, gems, seed=size * 100 + gems)
+            benchmarks.append(Benchmark(
+                f"apply_gravity/{suffix}", params,
+                holes.copy, lambda engine: engine.apply_gravity()))
+
+            dropped = holes.copy()
+            dropped.apply_gravity()
+            benchmarks.append(Benchmark(
+                f"refill/{suffix}", params,
+                dropped.copy, lambda engine: engine.refill()))
+    return benchmarks
+
+
+def render_benchmarks():
+    """
+    Build the rendering benchmarks, on the 8x8 board of the game itself.
+    """
+    import main
+
+    def board_with_holes():
+        # A settled board with its bottom two rows cleared and the gems dropped
+        board = main.Board(seed=1)
+        for row in range(main.GRID_SIZE - 2, main.GRID_SIZE):
+            for col in range(main.GRID_SIZE):
+                board.gem_pool.release(board.grid[row][col])
+                board.grid[row][col] = None
+                board.engine.clear(row, col)
+        board.apply_gravity()
+        return board
+
+    def idle_board():
+        board = main.Board(seed=1)
+        board.draw()
+        return board
+
+    plain = main.Gem(3, 3, "ruby")
+    special = main.Gem(3, 3, "diamond")
+    special.make_special("color_bomb")
+    fading = main.Gem(3, 3, "sapphire")
+    fading.alpha = 120
+    fading.scale = 0.6
+    board = main.Board(seed=1)
+
+    params = {"size": main.GRID_SIZE}
+    return [
+        Benchmark("Gem.draw/plain", params, lambda: plain, lambda gem: gem.draw()),
+        Benchmark("Gem.draw/special", params, lambda: special, lambda gem: gem.draw()),
+        Benchmark("Gem.draw/fading", params, lambda: fading, lambda gem: gem.draw()),
+        Benchmark("Board.draw", params, lambda: board, lambda board: board.draw()),
+        Benchmark("Board.draw_dirty/idle", params, idle_board, lambda board: board.draw_dirty()),
+        Benchmark("Board.refill_board", params, board_with_holes, lambda board: board.refill_board()),
+    ]
+
+
+def measure(benchmark, samples, warmup):
+    """
+    Time one benchmark, one operation per sample.
+
+    Like timeit, the garbage collector is off while an operation is timed.
+
+    Returns:
+        A dict of per-operation time percentiles in microseconds, plus the
+        mean time and ops/sec for information; a single slow sample can move
+        the mean a long way, so comparisons use the median (p50)
+    """
+    times = []
+    for i in range(warmup + samples):
+        arg = benchmark.setup()
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            benchmark.run(arg)
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if i >= warmup:
+            times.append(elapsed / 1000)
+
+    times.sort()
+    mean = sum(times) / len(times)
+    return {
+        "params": benchmark.params,
+        "samples": len(times),
+        "ops_per_sec": 1e6 / mean if mean else float("inf"),
+        "mean_us": mean,
+        "p50_us": percentile(times, 0.50),
+        "p95_us": percentile(times, 0.95),
+        "p99_us": percentile(times, 0.99),
+        "max_us": times[-1],
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline by median time per operation.
+
+    The median is used rather than the mean so that a stray slow sample (a
+    page fault, another process) can't fail the comparison.
+
+    Args:
+        results: Benchmark results by name, from measure
+        baseline: Results of an earlier run, in the same format
+        threshold: Largest allowed slowdown, in percent of the baseline median
+
+    Returns:
+        A list of (name, baseline p50 us, p50 us, slowdown in percent) for
+        every benchmark slower than the threshold
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["p50_us"]
+        if not before:
+            continue
+        change = (result["p50_us"] - before) / before * 100
+        if change > threshold:
+            regressions.append((name, before, result["p50_us"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Gem Fusion Quest's hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32], help="Board sizes for the logic benchmarks")
+    parser.add_argument("--gems", type=int, nargs="+", default=[4, 6], help="Gem type counts (fewer is denser)")
+    parser.add_argument("--numpy", action="store_true", help="Also benchmark the NumPy-backed engine")
+    parser.add_argument("--no-render", action="store_true", help="Skip the rendering benchmarks")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this text")
+    parser.add_argument("--samples", type=int, default=300, help="Timed operations per benchmark")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed operations before sampling")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results from an earlier --json run")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown of the median time against the baseline, in percent")
+    args = parser.parse_args()
+
+    benchmarks = engine_benchmarks(BoardEngine, args.sizes, args.gems)
+    if args.numpy:
+        from array_engine import ArrayBoardEngine
+        benchmarks += engine_benchmarks(ArrayBoardEngine, args.sizes, args.gems)
+    if not args.no_render:
+        benchmarks += render_benchmarks()
+    if args.only:
+        benchmarks = [benchmark for benchmark in benchmarks if args.only in benchmark.name]
+
+    results = {}
+    for benchmark in benchmarks:
+        result = measure(benchmark, args.samples, args.warmup)
+        results[benchmark.name] = result
+        print(f"{benchmark.name:<44} {result['ops_per_sec']:12.0f} ops/s  "
+              f"p50 {result['p50_us']:9.1f}us  p95 {result['p95_us']:9.1f}us  p99 {result['p99_us']:9.1f}us")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name}: p50 {before:.1f} -> {after:.1f}us ({change:+.1f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No benchmark slower than {args.threshold:g}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,699 @@
+import random
+from collections import namedtuple
+
+# Gem types, in the same order as GEM_COLORS in main.py
+GEM_TYPES = ("ruby", "sapphire", "emerald", "topaz", "amethyst", "diamond")
+
+# Marker for an empty cell
+EMPTY = -1
+
+# Special gems, in the order their codes are stored (0 means no special)
+# The shapes that make each one follow concept.json:
+#   line: Clears its whole row when cleared (made by a run of 4)
+#   bomb: Clears the 3x3 area around it (made by a run of 5 or more)
+#   color_bomb: Clears every gem of its own color (made by an L or T shape)
+SPECIAL_TYPES = ("line", "bomb", "color_bomb")
+
+# Points for each gem cleared by a special's effect rather than a match
+SPECIAL_CLEAR_POINTS = 10
+
+# Cascade steps after this many create no new specials; the ones already on
+# the board still go off. A color bomb or line can clear and refill so much of
+# a large board that the refills make more specials, and the chain would never
+# settle.
+SPECIAL_CASCADE_LIMIT = 8
+
+# The result of planning one batched clear
+#   cleared: (row, col) cells to empty, matched or caught in a special's effect
+#   created: (row, col, special) for the specials the matches create; these
+#       cells keep their gem and are not cleared
+#   triggered: (row, col, special) for every special set off, in the order
+#       their effects were applied
+#   points: Points the clear scores
+#   mask: The cleared cells in the engine's own representation
+ClearPlan = namedtuple("ClearPlan", ["cleared", "created", "triggered", "points", "mask"])
+
+
+def score_matches(matches):
+    """
+    Score a set of matches found in one pass.
+
+    Args:
+        matches: A list of matches, each a list of (row, col) tuples
+
+    Returns:
+        The points awarded: 10 per matched gem, plus 20 for each gem
+        beyond three in a single run
+    """
+    matched_positions = set()
+    points = 0
+    for match in matches:
+        matched_positions.update(match)
+        if len(match) > 3:
+            points += (len(match) - 3) * 20  # Bonus for each gem beyond 3
+    return points + len(matched_positions) * 10  # Base points
+
+
+def _special_cell(cells, swapped, fired):
+    # The cell a new special goes on: the one the player swapped if any,
+    # otherwise the first, skipping cells whose own special goes off
+    free = [position for position in cells if position not in fired]
+    return next((position for position in free if position in swapped), free[0] if free else None)
+
+
+def plan_specials(matches, swapped=(), fired=()):
+    """
+    Decide which special gems a set of matches creates.
+
+    Runs that share a cell form an L, T or larger shape, and each such shape
+    makes one color bomb, on a cell where its runs cross: the one the player
+    swapped if it is a crossing, otherwise the first. Any other run of 4
+    makes a line gem and a run of 5 or more a bomb, placed on the cell
+    the player swapped into the run, or the run's first cell when the run
+    came from a cascade. Every shape and run keeps only one cell for its
+    special, so every match always clears at least one cell.
+
+    A special already on a matched cell goes off in the same step, so no new
+    special is placed there: the next cell in line is used instead, and a
+    shape or run with every cell taken makes nothing.
+
+    Args:
+        matches: A list of matches, as returned by find_matches
+        swapped: The (row, col) cells of the swap that made the matches, if any
+        fired: The matched (row, col) cells that hold a special
+
+    Returns:
+        A dict mapping (row, col) to the special created there
+    """
+    # Group runs that share a cell. A cell can only be in one horizontal and
+    # one vertical run, so the cells seen twice are exactly the crossings.
+    owner = {}
+    parent = list(range(len(matches)))
+
+    def find(group):
+        while parent[group] != group:
+            parent[group] = parent[parent[group]]
+            group = parent[group]
+        return group
+
+    crossings = []
+    for group, match in enumerate(matches):
+        for position in match:
+            if position in owner:
+                crossings.append(position)
+                parent[find(group)] = find(owner[position])
+            else:
+                owner[position] = group
+
+    created = {}
+    shapes = {}
+    for position in crossings:
+        shapes.setdefault(find(owner[position]), []).append(position)
+    for root, cells in shapes.items():
+        cell = _special_cell(sorted(cells), swapped, fired)
+        if cell is None:
+            shape = [position for group, match in enumerate(matches) if find(group) == root for position in match]
+            cell = _special_cell(sorted(set(shape)), swapped, fired)
+        if cell is not None:
+            created[cell] = "color_bomb"
+
+    for group, match in enumerate(matches):
+        if len(match) < 4 or find(group) in shapes:
+            continue
+        cell = _special_cell(match, swapped, fired)
+        if cell is not None:
+            created[cell] = "line" if len(match) == 4 else "bomb"
+    return created
+
+
+class BoardEngine:
+    """
+    Board logic for the match-3 game, independent of pygame.
+
+    Gem types are stored as small integers (indices into gem_types) and as
+    one bitmask plane per type. Cell (row, col) lives at bit row * stride + col,
+    where stride is cols + 1: the extra always-empty guard column stops runs
+    from wrapping from the end of one row into the start of the next, so
+    horizontal and vertical runs can be found with plain shifts and ANDs.
+    """
+
+    def __init__(self, rows=8, cols=8, gem_types=GEM_TYPES, seed=None):
+        """
+        Initialize an empty board.
+
+        Args:
+            rows: Number of rows on the board
+            cols: Number of columns on the board
+            gem_types: Names of the gem types, indexed by type id
+            seed: Seed for the board's random generator, or None for a random one.
+                Every gem the board creates comes from this generator, so the
+                same seed and moves always replay the same game.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.gem_types = tuple(gem_types)
+        self.stride = cols + 1
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+        # One bitmask plane per gem type, plus a flat type array for O(1) lookups
+        self.planes = [0] * len(self.gem_types)
+        self.cells = [EMPTY] * (rows * self.stride)
+        self.occupied = 0
+
+        # Special gem code per cell (an index into SPECIAL_TYPES plus one, or
+        # 0), plus a bitmask of every cell holding a special
+        self.special_codes = [0] * (rows * self.stride)
+        self.special_mask = 0
+
+        # Masks for a full row, a full column and the whole board
+        self.row_mask = (1 << cols) - 1
+        self.col_mask = 0
+        for row in range(rows):
+            self.col_mask |= 1 << (row * self.stride)
+        self.board_mask = 0
+        for row in range(rows):
+            self.board_mask |= self.row_mask << (row * self.stride)
+        self.row_masks = [self.row_mask << (row * self.stride) for row in range(rows)]
+        self.col_masks = [self.col_mask << col for col in range(cols)]
+
+        # Rows and columns changed since the board last settled (as bitmasks of
+        # row and column numbers). Only these can hold a match, so find_matches
+        # rescans just them.
+        self.dirty_rows = 0
+        self.dirty_cols = 0
+
+        # Cells changed since the move index last caught up (as board bits)
+        self.changed = 0
+
+    def copy(self):
+        """
+        Make an independent copy of the board, including its generator state.
+        """
+        clone = BoardEngine.__new__(BoardEngine)
+        clone.__dict__.update(self.__dict__)
+        clone.planes = list(self.planes)
+        clone.cells = list(self.cells)
+        clone.special_codes = list(self.special_codes)
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        return clone
+
+    def reseed(self, seed):
+        """
+        Restart the board's generator from a new seed, e.g. so a copy used for
+        look-ahead doesn't draw the same gems the real board will.
+        """
+        self.rng.seed(seed)
+
+    def bit_index(self, row, col):
+        return row * self.stride + col
+
+    def position(self, index):
+        """
+        Convert a bit index back to a (row, col) tuple.
+        """
+        return divmod(index, self.stride)
+
+    def get(self, row, col):
+        """
+        Get the gem type id at a cell, or EMPTY.
+        """
+        return self.cells[row * self.stride + col]
+
+    def get_type(self, row, col):
+        """
+        Get the gem type name at a cell, or None if the cell is empty.
+        """
+        gem = self.cells[row * self.stride + col]
+        return None if gem == EMPTY else self.gem_types[gem]
+
+    def type_id(self, gem_type):
+        return self.gem_types.index(gem_type)
+
+    def get_special(self, row, col):
+        """
+        Get the special type name at a cell, or None if it holds a plain gem.
+        """
+        code = self.special_codes[row * self.stride + col]
+        return SPECIAL_TYPES[code - 1] if code else None
+
+    def set(self, row, col, gem, special=0):
+        """
+        Place a gem at a cell, replacing whatever was there.
+
+        Args:
+            row, col: The cell to set
+            gem: The gem type id, or EMPTY to clear the cell
+            special: The special code of the gem (see SPECIAL_TYPES), 0 for a
+                plain gem
+        """
+        index = row * self.stride + col
+        bit = 1 << index
+        if self.special_codes[index] != special:
+            self.special_codes[index] = special
+            if special:
+                self.special_mask |= bit
+            else:
+                self.special_mask &= ~bit
+        old = self.cells[index]
+        if old == gem:
+            return
+        if old != EMPTY:
+            self.planes[old] &= ~bit
+        self.cells[index] = gem
+        self.dirty_rows |= 1 << row
+        self.dirty_cols |= 1 << col
+        self.changed |= bit
+        if gem == EMPTY:
+            self.occupied &= ~bit
+        else:
+            self.planes[gem] |= bit
+            self.occupied |= bit
+
+    def clear(self, row, col):
+        self.set(row, col, EMPTY)
+
+    def swap(self, row1, col1, row2, col2):
+        """
+        Swap the gems at two cells.
+        """
+        index1 = row1 * self.stride + col1
+        index2 = row2 * self.stride + col2
+        gem1, special1 = self.cells[index1], self.special_codes[index1]
+        gem2, special2 = self.cells[index2], self.special_codes[index2]
+        self.set(row1, col1, gem2, special2)
+        self.set(row2, col2, gem1, special1)
+
+    def shuffle(self):
+        """
+        Randomly rearrange the gems already on the board. Special gems keep
+        their specials.
+        """
+        positions = [(row, col) for row in range(self.rows) for col in range(self.cols)]
+        gems = [(self.cells[row * self.stride + col], self.special_codes[row * self.stride + col])
+                for row, col in positions]
+        self.rng.shuffle(gems)
+        for (row, col), (gem, special) in zip(positions, gems):
+            self.set(row, col, gem, special)
+
+    def random_gem(self, row, col):
+        """
+        Pick a random gem type that doesn't complete a run to the left or above.
+
+        Args:
+            row, col: The cell the gem is for
+
+        Returns:
+            A gem type id
+        """
+        available = list(range(len(self.gem_types)))
+
+        # Check horizontal matches
+        if col >= 2:
+            left = self.get(row, col - 1)
+            if left != EMPTY and left == self.get(row, col - 2) and left in available:
+                available.remove(left)
+
+        # Check vertical matches
+        if row >= 2:
+            above = self.get(row - 1, col)
+            if above != EMPTY and above == self.get(row - 2, col) and above in available:
+                available.remove(above)
+
+        # If no available types (rare case), just return a random one
+        if not available:
+            return self.rng.randrange(len(self.gem_types))
+
+        return self.rng.choice(available)
+
+    def fill_initial(self):
+        """
+        Fill the board with random gems, avoiding any initial matches.
+        """
+        for row in range(self.rows):
+            for col in range(self.cols):
+                self.set(row, col, self.random_gem(row, col))
+
+    def _runs(self, covered, step):
+        # Split a mask of matched cells into maximal runs along step (1 or stride)
+        runs = []
+        starts = covered & ~(covered << step)
+        while starts:
+            low = starts & -starts
+            index = low.bit_length() - 1
+            starts ^= low
+            run = []
+            while covered >> index & 1:
+                run.append(divmod(index, self.stride))
+                index += step
+            runs.append(run)
+        return runs
+
+    def _dirty_mask(self, dirty, masks):
+        mask = 0
+        while dirty:
+            low = dirty & -dirty
+            mask |= masks[low.bit_length() - 1]
+            dirty ^= low
+        return mask
+
+    def mark_all_dirty(self):
+        """
+        Force the next find_matches to rescan the whole board.
+        """
+        self.dirty_rows = (1 << self.rows) - 1
+        self.dirty_cols = (1 << self.cols) - 1
+
+    def find_matches(self, full=False):
+        """
+        Find all horizontal and vertical runs of three or more identical gems.
+
+        Only rows and columns changed since the board last settled are
+        rescanned; the result is the same as a full scan because the rest
+        held no runs when it settled. Finding no matches settles the board.
+
+        Args:
+            full: Rescan every row and column instead of only the dirty ones
+
+        Returns:
+            A list of matches, each a list of (row, col) tuples. Horizontal
+            runs come first in row-major order, then vertical runs in
+            column-major order.
+        """
+        if full:
+            row_region = col_region = self.board_mask
+        else:
+            if not self.dirty_rows:
+                return []
+            row_region = self._dirty_mask(self.dirty_rows, self.row_masks)
+            col_region = self._dirty_mask(self.dirty_cols, self.col_masks)
+
+        stride = self.stride
+        horizontal = []
+        vertical = []
+        for plane in self.planes:
+            if not plane:
+                continue
+
+            # Bits that start a run of three, spread back over the whole run
+            cells = plane & row_region
+            run3 = cells & (cells >> 1) & (cells >> 2)
+            if run3:
+                horizontal.extend(self._runs(run3 | (run3 << 1) | (run3 << 2), 1))
+
+            cells = plane & col_region
+            run3 = cells & (cells >> stride) & (cells >> (2 * stride))
+            if run3:
+                covered = run3 | (run3 << stride) | (run3 << (2 * stride))
+                vertical.extend(self._runs(covered, stride))
+
+        if not horizontal and not vertical:
+            # Settled: no row or column holds a match any more
+            self.dirty_rows = 0
+            self.dirty_cols = 0
+            return []
+
+        horizontal.sort()
+        vertical.sort(key=lambda run: (run[0][1], run[0][0]))
+        return horizontal + vertical
+
+    def plan_clear(self, matches, swapped=(), create_specials=True):
+        """
+        Work out everything one cascade step clears, without changing the board.
+
+        Specials caught in the clear are set off, and so are specials caught in
+        their effects, until no new ones are reached. Each effect is a
+        precomputed mask (a row, a 3x3 area or a color plane) unioned into the
+        cleared set, and each special fires at most once, so a whole chain
+        reaction costs O(cells) per step.
+
+        Args:
+            matches: The matches currently on the board, from find_matches
+            swapped: The (row, col) cells of the player's swap, if this step
+                came straight from one
+            create_specials: Whether the matches make specials, see
+                SPECIAL_CASCADE_LIMIT
+
+        Returns:
+            A ClearPlan, to be applied with apply_clear
+        """
+        stride = self.stride
+        matched = 0
+        for match in matches:
+            for row, col in match:
+                matched |= 1 << (row * stride + col)
+
+        created = {}
+        if create_specials:
+            fired = {(row, col) for match in matches for row, col in match
+                     if self.special_codes[row * stride + col]}
+            created = plan_specials(matches, swapped, fired)
+
+        cleared = matched
+        triggered = []
+        frontier = matched & self.special_mask
+        while frontier:
+            effect = 0
+            while frontier:
+                low = frontier & -frontier
+                frontier ^= low
+                index = low.bit_length() - 1
+                special = SPECIAL_TYPES[self.special_codes[index] - 1]
+                row, col = divmod(index, stride)
+                triggered.append((row, col, special))
+                if special == "line":
+                    effect |= self.row_masks[row]
+                elif special == "bomb":
+                    effect |= self._area_mask(row, col)
+                else:
+                    effect |= self.planes[self.cells[index]]
+            reached = effect & self.occupied & ~cleared
+            cleared |= reached
+            frontier = reached & self.special_mask
+
+        # New specials stay on the board
+        for row, col in created:
+            cleared &= ~(1 << (row * stride + col))
+
+        cells = []
+        remaining = cleared
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            cells.append(divmod(low.bit_length() - 1, stride))
+
+        extra = bin(cleared & ~matched).count("1")
+        points = score_matches(matches) + extra * SPECIAL_CLEAR_POINTS
+        created = [(row, col, special) for (row, col), special in sorted(created.items())]
+        return ClearPlan(cells, created, triggered, points, cleared)
+
+    def _area_mask(self, row, col):
+        # The 3x3 area around a cell, clipped to the board
+        area = (7 << col >> 1) & self.row_mask
+        mask = 0
+        for area_row in range(max(row - 1, 0), min(row + 2, self.rows)):
+            mask |= area << (area_row * self.stride)
+        return mask
+
+    def apply_clear(self, plan):
+        """
+        Apply a ClearPlan: empty every cleared cell in one batch and place the
+        specials it creates.
+
+        Returns:
+            The number of cells cleared
+        """
+        mask = plan.mask
+        keep = ~mask
+        self.planes = [plane & keep for plane in self.planes]
+        self.occupied &= keep
+        self.special_mask &= keep
+        self.changed |= mask
+        stride = self.stride
+        for row, col in plan.cleared:
+            index = row * stride + col
+            self.cells[index] = EMPTY
+            self.special_codes[index] = 0
+            self.dirty_rows |= 1 << row
+            self.dirty_cols |= 1 << col
+
+        for row, col, special in plan.created:
+            self.set(row, col, self.get(row, col), SPECIAL_TYPES.index(special) + 1)
+        return len(plan.cleared)
+
+    def apply_gravity(self):
+        """
+        Drop gems down into empty cells below them.
+
+        Returns:
+            A list of (from_row, to_row, col) moves, in the order they were made
+        """
+        moves = []
+        empty = self.board_mask & ~self.occupied
+        for col in range(self.cols):
+            if not empty & self.col_masks[col]:
+                continue  # Nothing to fall into
+            target = self.rows - 1
+            for row in range(self.rows - 1, -1, -1):
+                gem = self.get(row, col)
+                if gem == EMPTY:
+                    continue
+                if row != target:
+                    self.set(target, col, gem, self.special_codes[row * self.stride + col])
+                    self.clear(row, col)
+                    moves.append((row, target, col))
+                target -= 1
+        return moves
+
+    def refill(self):
+        """
+        Fill every empty cell with a random gem.
+
+        Returns:
+            A list of (row, col, gem_type_id) for the new gems, column by column
+        """
+        new_gems = []
+        empty = self.board_mask & ~self.occupied
+        n_types = len(self.gem_types)
+        for col in range(self.cols):
+            # Walk the column's empty cells from the top down
+            col_empty = empty & self.col_masks[col]
+            while col_empty:
+                low = col_empty & -col_empty
+                col_empty ^= low
+                row = (low.bit_length() - 1) // self.stride
+                gem = self.rng.randrange(n_types)
+                self.set(row, col, gem)
+                new_gems.append((row, col, gem))
+        return new_gems
+
+
+class MoveIndex:
+    """
+    Index of every swap that would produce a match.
+
+    Valid swaps are kept as two bitmasks of anchor cells, one for swaps with
+    the cell to the right and one for swaps with the cell below. All swaps are
+    evaluated at once with a dozen shifts and ANDs per gem type, and only
+    again after the board has changed, so keeping the index current every
+    turn costs far less than a find_matches per candidate swap.
+    """
+
+    def __init__(self, engine):
+        """
+        Initialize the index for a board.
+
+        Args:
+            engine: The BoardEngine to index
+        """
+        self.engine = engine
+
+        # Cells that can be the left or top cell of a swap
+        self.right_anchors = engine.board_mask & (engine.board_mask >> 1)
+        self.down_anchors = engine.board_mask & (engine.board_mask >> engine.stride)
+
+        self.right_moves = 0
+        self.down_moves = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Re-evaluate every swap on the board.
+        """
+        engine = self.engine
+        engine.changed = 0
+        stride = engine.stride
+        occupied = engine.occupied
+        right_moves = 0
+        down_moves = 0
+
+        for plane in engine.planes:
+            if not plane:
+                continue
+
+            # Cells whose neighbours complete a run of this gem type: the pair
+            # to the left, either side, to the right, and the same vertically.
+            # The guard column keeps the horizontal ones from wrapping rows.
+            left = (plane << 1) & (plane << 2)
+            around = (plane << 1) & (plane >> 1)
+            right = (plane >> 1) & (plane >> 2)
+            up = (plane << stride) & (plane << (2 * stride))
+            middle = (plane << stride) & (plane >> stride)
+            down = (plane >> stride) & (plane >> (2 * stride))
+            vertical = up | middle | down
+            horizontal = left | around | right
+
+            # Cells another gem type could give this gem up to
+            others = occupied & ~plane
+
+            # A gem moving into a cell leaves its old cell empty, so runs that
+            # would need the old cell don't count
+            right_moves |= (left | vertical) & others & (plane >> 1)                     # Moves left
+            right_moves |= ((right | vertical) & others & (plane << 1)) >> 1             # Moves right
+            down_moves |= (horizontal | up) & others & (plane >> stride)                 # Moves up
+            down_moves |= ((horizontal | down) & others & (plane << stride)) >> stride   # Moves down
+
+        self.right_moves = right_moves & self.right_anchors
+        self.down_moves = down_moves & self.down_anchors
+
+    def update(self):
+        """
+        Bring the index up to date if the board changed since the last update.
+        """
+        if self.engine.changed:
+            self.rebuild()
+
+    @property
+    def moves(self):
+        """
+        The set of valid swaps, as (row1, col1, row2, col2) tuples with cell 1
+        left of or above cell 2.
+        """
+        engine = self.engine
+        moves = set()
+        for anchors, d_row, d_col in ((self.right_moves, 0, 1), (self.down_moves, 1, 0)):
+            while anchors:
+                low = anchors & -anchors
+                anchors ^= low
+                row, col = engine.position(low.bit_length() - 1)
+                moves.add((row, col, row + d_row, col + d_col))
+        return moves
+
+    def is_valid(self, row1, col1, row2, col2):
+        """
+        Check whether swapping two adjacent cells would produce a match.
+        """
+        if (row2, col2) < (row1, col1):
+            row1, col1, row2, col2 = row2, col2, row1, col1
+        bit = 1 << self.engine.bit_index(row1, col1)
+        if row1 == row2:
+            return bool(self.right_moves & bit)
+        return bool(self.down_moves & bit)
+
+    def has_moves(self):
+        return bool(self.right_moves or self.down_moves)
+
+    def hint(self):
+        """
+        Get one valid swap, or None if the board is deadlocked.
+        """
+        moves = self.moves
+        return min(moves) if moves else None
+
+    def reshuffle(self, max_attempts=100):
+        """
+        Shuffle a deadlocked board until it has no matches and at least one move.
+
+        Returns:
+            True if a playable arrangement was found
+        """
+        engine = self.engine
+        for _ in range(max_attempts):
+            engine.shuffle()
+            if not engine.find_matches(full=True):
+                self.rebuild()
+                if self.moves:
+                    return True
+        self.rebuild()
+        return False
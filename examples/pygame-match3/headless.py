@@ -0,0 +1,368 @@
+"""
+Headless, render-free simulation of Gem Fusion Quest.
+
+Swaps, cascades, gravity and refills are resolved instantly on a BoardEngine,
+with no display, fonts or animation ticks, so one process can play thousands
+of games per second for balancing and regression runs. evaluate_moves scores
+candidate swaps on snapshots of a board for bots and hints.
+
+Usage:
+    python headless.py --games 1000
+    python headless.py --games 10 --size 64 --numpy
+    python headless.py --replay game.replay
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from board_engine import BoardEngine, GEM_TYPES, SPECIAL_CASCADE_LIMIT, MoveIndex
+from replay import ReplayLog
+
+# Outcome of a single step
+#   valid: Whether the swap produced a match (invalid swaps are swapped back)
+#   points: Points scored by the swap and its cascades
+#   cascades: Number of match-clear-refill rounds the swap triggered
+#   cleared: Number of gems cleared
+#   moves_left: Moves remaining after the step
+#   game_over: Whether the game has ended
+StepResult = namedtuple("StepResult", ["valid", "points", "cascades", "cleared", "moves_left", "game_over"])
+
+# What a swap would do, from evaluate_moves
+#   move: The (row1, col1, row2, col2) swap evaluated
+#   valid: Whether the swap makes a match
+#   points, cascades, cleared: As in StepResult, for the full cascade
+MoveEvaluation = namedtuple("MoveEvaluation", ["move", "valid", "points", "cascades", "cleared"])
+
+
+def resolve_cascade(engine, matches, swapped=()):
+    """
+    Clear matches, apply gravity and refill on a board until it settles.
+
+    Each step creates and sets off special gems as the animated game does,
+    and clears everything in one batch. Only the first SPECIAL_CASCADE_LIMIT
+    steps create new specials, so even large boards settle.
+
+    Args:
+        engine: The board to resolve, a BoardEngine or ArrayBoardEngine
+        matches: The matches currently on the board
+        swapped: The (row, col) cells of the swap that made the matches, if any
+
+    Returns:
+        A (points, cascades, cleared) tuple
+    """
+    points = 0
+    cascades = 0
+    cleared = 0
+    while matches:
+        cascades += 1
+        plan = engine.plan_clear(matches, swapped, cascades <= SPECIAL_CASCADE_LIMIT)
+        if not plan.cleared:
+            # Nothing would change, so the same matches would come back forever
+            break
+        points += plan.points
+        cleared += engine.apply_clear(plan)
+        engine.apply_gravity()
+        engine.refill()
+        matches = engine.find_matches()
+        swapped = ()  # Later steps are cascades, not the player's swap
+    return points, cascades, cleared
+
+
+def make_move_index(engine):
+    """
+    Make the move index that matches a board's engine: a MoveIndex for a
+    BoardEngine, an ArrayMoveIndex for an ArrayBoardEngine.
+    """
+    if isinstance(engine, BoardEngine):
+        return MoveIndex(engine)
+    from array_engine import ArrayMoveIndex
+    return ArrayMoveIndex(engine)
+
+
+def check_move(engine, move):
+    """
+    Check that a move swaps two adjacent cells on the board.
+
+    Raises:
+        ValueError: If the move is outside the board or not an adjacent swap
+    """
+    row1, col1, row2, col2 = move
+    if not (0 <= row1 < engine.rows and 0 <= col1 < engine.cols and
+            0 <= row2 < engine.rows and 0 <= col2 < engine.cols):
+        raise ValueError(f"Move {move} is outside the board")
+    if abs(row1 - row2) + abs(col1 - col2) != 1:
+        raise ValueError(f"Move {move} does not swap adjacent cells")
+
+
+def evaluate_move(engine, move, seed=None):
+    """
+    Work out what a swap would score, including its full cascade, on a copy
+    of the board. The board itself is left untouched.
+
+    Args:
+        engine: The board, a BoardEngine or ArrayBoardEngine
+        move: A (row1, col1, row2, col2) tuple naming two adjacent cells
+        seed: Seed for the refills on the copy, or None to draw them from a
+            copy of the board's own generator (the exact outcome of the move)
+
+    Returns:
+        A MoveEvaluation
+    """
+    check_move(engine, move)
+    row1, col1, row2, col2 = move
+    board = engine.copy()
+    if seed is not None:
+        board.reseed(seed)
+    board.swap(row1, col1, row2, col2)
+    matches = board.find_matches()
+    if not matches:
+        return MoveEvaluation(move, False, 0, 0, 0)
+    points, cascades, cleared = resolve_cascade(board, matches, ((row1, col1), (row2, col2)))
+    return MoveEvaluation(move, True, points, cascades, cleared)
+
+
+# Fewest moves worth sending to worker processes. Each batch pickles the
+# board and makes a round trip to a worker, a millisecond or two in all, which
+# is about what evaluating a hundred swaps of a small board costs here.
+MIN_PARALLEL_MOVES = 128
+
+# Worker pool kept between evaluate_moves calls, and its size
+_pool = None
+_pool_workers = 0
+
+
+def _evaluate_batch(engine, moves, seeds):
+    # Runs in a worker process
+    return [evaluate_move(engine, move, seed) for move, seed in zip(moves, seeds)]
+
+
+def _worker_pool(workers):
+    # Starting worker processes takes far longer than a batch of evaluations,
+    # so the pool is started once and reused by later calls
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def evaluate_moves(engine, moves, seed=None, workers=None, executor=None):
+    """
+    Evaluate many candidate swaps against a snapshot of the board, without
+    changing it.
+
+    Every swap is played out on its own copy of the board, so the results
+    don't depend on the order of the moves or on how they are split between
+    worker processes.
+
+    Args:
+        engine: The board, a BoardEngine or ArrayBoardEngine
+        moves: The (row1, col1, row2, col2) swaps to evaluate
+        seed: None to evaluate every swap with the board's real upcoming
+            refills, or a seed to draw each swap's refills from an unrelated
+            generator, so a bot can't see the gems the game will drop
+        workers: Number of worker processes to fan out to, or None to
+            evaluate in this process. The processes are started on first use
+            and kept for later calls.
+        executor: A concurrent.futures executor owned by the caller to fan
+            out to instead, with workers giving the number of batches
+            (default 8). Fewer than MIN_PARALLEL_MOVES moves are always
+            evaluated in this process, whatever workers and executor say.
+
+    Returns:
+        A list of MoveEvaluations, in the same order as moves
+
+    Raises:
+        ValueError: If a move is outside the board or not an adjacent swap
+    """
+    moves = list(moves)
+    for move in moves:
+        check_move(engine, move)
+    if seed is None:
+        seeds = [None] * len(moves)
+    else:
+        rng = random.Random(seed)
+        seeds = [rng.getrandbits(64) for _ in moves]
+
+    if len(moves) < MIN_PARALLEL_MOVES or (executor is None and (not workers or workers < 2)):
+        return _evaluate_batch(engine, moves, seeds)
+
+    # One contiguous batch per worker; the board is pickled once per batch
+    pool = executor or _worker_pool(workers)
+    size = -(-len(moves) // (workers or 8))
+    batches = [pool.submit(_evaluate_batch, engine, moves[start:start + size], seeds[start:start + size])
+               for start in range(0, len(moves), size)]
+    return [evaluation for batch in batches for evaluation in batch.result()]
+
+
+class HeadlessGame:
+    """
+    A match-3 game with the same rules as Board in main.py, minus rendering.
+    """
+
+    def __init__(self, rows=8, cols=8, moves=30, gem_types=GEM_TYPES, engine_class=BoardEngine, seed=None):
+        """
+        Initialize a new game.
+
+        Args:
+            rows: Number of rows on the board
+            cols: Number of columns on the board
+            moves: Number of moves the player starts with
+            gem_types: Names of the gem types in play
+            engine_class: Board logic to use, BoardEngine or the NumPy-backed
+                ArrayBoardEngine for large boards
+            seed: Seed for the board's random generator, or None for a random one
+        """
+        self.engine = engine_class(rows, cols, gem_types, seed=seed)
+        self.engine.fill_initial()
+        # Swaps that make a match; the board is reshuffled when there are none
+        self.move_index = make_move_index(self.engine)
+        if not self.move_index.has_moves():
+            self.move_index.reshuffle()
+        self.score = 0
+        self.moves_left = moves
+        self.level = 1
+        self.replay = ReplayLog(self.engine.seed, rows, cols, moves, "bitboard" if engine_class is BoardEngine else "numpy")
+
+    def is_game_over(self):
+        return self.moves_left <= 0
+
+    def step(self, move):
+        """
+        Play one swap and resolve everything it triggers.
+
+        Args:
+            move: A (row1, col1, row2, col2) tuple naming two adjacent cells
+
+        Returns:
+            A StepResult describing the outcome
+
+        Raises:
+            ValueError: If the game is over or the move is not an adjacent swap
+        """
+        if self.is_game_over():
+            raise ValueError("Game is over")
+
+        engine = self.engine
+        check_move(engine, move)
+        row1, col1, row2, col2 = move
+
+        # Like the animated game, every attempted swap costs a move
+        self.moves_left -= 1
+        self.replay.record(move)
+        engine.swap(row1, col1, row2, col2)
+
+        matches = engine.find_matches()
+        if not matches:
+            # No match, swap back
+            engine.swap(row1, col1, row2, col2)
+            return StepResult(False, 0, 0, 0, self.moves_left, self.is_game_over())
+
+        points, cascades, cleared = self.resolve(matches, ((row1, col1), (row2, col2)))
+        self.move_index.update()
+        if not self.move_index.has_moves():
+            self.move_index.reshuffle()
+        return StepResult(True, points, cascades, cleared, self.moves_left, self.is_game_over())
+
+    def resolve(self, matches, swapped=()):
+        """
+        Clear matches, apply gravity and refill until the board settles.
+
+        Args:
+            matches: The matches found after the swap
+            swapped: The (row, col) cells of the swap
+
+        Returns:
+            A (points, cascades, cleared) tuple
+        """
+        points, cascades, cleared = resolve_cascade(self.engine, matches, swapped)
+        self.score += points
+        return points, cascades, cleared
+
+    def valid_moves(self):
+        """
+        Get every swap that would produce a match.
+        """
+        return sorted(self.move_index.moves)
+
+    def random_move(self, rng=random):
+        """
+        Pick a random adjacent swap.
+        """
+        engine = self.engine
+        if rng.random() < 0.5:
+            row, col = rng.randrange(engine.rows), rng.randrange(engine.cols - 1)
+            return (row, col, row, col + 1)
+        row, col = rng.randrange(engine.rows - 1), rng.randrange(engine.cols)
+        return (row, col, row + 1, col)
+
+
+def fast_forward(log, gem_types=GEM_TYPES):
+    """
+    Rebuild a game from a replay log, without animations.
+
+    Args:
+        log: A ReplayLog recorded by Board or HeadlessGame
+
+    Returns:
+        The HeadlessGame after every recorded move has been played, on the
+        engine the log was recorded with
+    """
+    engine_class = BoardEngine
+    if log.engine == "numpy":
+        from array_engine import ArrayBoardEngine
+        engine_class = ArrayBoardEngine
+    game = HeadlessGame(log.rows, log.cols, log.start_moves, gem_types, engine_class, seed=log.seed)
+    for move in log.moves:
+        game.step(move)
+    return game
+
+
+def play_random_game(rows=8, cols=8, moves=30, rng=random, engine_class=BoardEngine):
+    """
+    Play a full game with random swaps and return the final score.
+    """
+    game = HeadlessGame(rows, cols, moves, engine_class=engine_class)
+    while not game.is_game_over():
+        game.step(game.random_move(rng))
+    return game.score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play random headless games of Gem Fusion Quest")
+    parser.add_argument("--games", type=int, default=1000, help="Number of games to play")
+    parser.add_argument("--size", type=int, default=8, help="Board width and height")
+    parser.add_argument("--moves", type=int, default=30, help="Moves per game")
+    parser.add_argument("--numpy", action="store_true", help="Use the NumPy-backed engine (for large boards)")
+    parser.add_argument("--replay", help="Fast-forward a saved replay log and print its final state")
+    args = parser.parse_args()
+
+    if args.replay:
+        log = ReplayLog.load(args.replay)
+        game = fast_forward(log)
+        print(f"Seed {log.seed} ({log.engine} engine): {len(log.moves)} moves, final score {game.score}, {game.moves_left} moves left")
+        for row in range(game.engine.rows):
+            print(" ".join(game.engine.get_type(row, col)[:2] for col in range(game.engine.cols)))
+        return
+
+    engine_class = BoardEngine
+    if args.numpy:
+        # Only needed for large boards, so NumPy is imported on demand
+        from array_engine import ArrayBoardEngine
+        engine_class = ArrayBoardEngine
+
+    start = time.perf_counter()
+    scores = [play_random_game(args.size, args.size, args.moves, engine_class=engine_class)
+              for _ in range(args.games)]
+    elapsed = time.perf_counter() - start
+
+    print(f"Played {args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/sec)")
+    print(f"Average score: {sum(scores) / len(scores):.1f}, best: {max(scores)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import pygame
-import random
 import sys
 import math
+from board_engine import BoardEngine, MoveIndex, SPECIAL_CASCADE_LIMIT
+from replay import ReplayLog
+from profiler import FrameProfiler
 
 # Initialize Pygame
 pygame.init()
@@ -17,6 +19,13 @@ ANIMATION_SPEED = 10  # Speed of animations
 SWAP_ANIMATION_SPEED = 5  # Speed of swap animations
 FALL_SPEED = 15  # Speed of falling gems
 
+# Fixed timestep
+# The board and its animations advance in fixed steps, so the game plays at the
+# same speed at any frame rate. Frames draw gems interpolated between steps.
+SIMULATION_RATE = 60  # Board updates per second
+STEP_MS = 1000 / SIMULATION_RATE
+MAX_STEPS_PER_FRAME = 5  # After a long stall, drop time rather than try to catch up
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -42,194 +51,337 @@ clock = pygame.time.Clock()
 font = pygame.font.Font(None, 36)
 small_font = pygame.font.Font(None, 24)
 
+# Hint button, under the level display
+HINT_BUTTON_RECT = pygame.Rect(WINDOW_WIDTH - 150, 60, 110, 34)
+
+# Gem sprite cache
+# Each look of a gem is rendered once and then blitted; fades use set_alpha on the
+# cached surface. Scales are snapped to buckets so shrinking gems reuse sprites too.
+SCALE_BUCKETS = 20  # Steps of 0.05, the per-frame shrink of a matched gem
+RAINBOW_COLORS = list(GEM_COLORS.values())
+gem_sprite_cache = {}
+
+def render_gem_sprite(gem_type, special_type, selected, size):
+    color = GEM_COLORS[gem_type]
+    
+    # Create a surface with per-pixel alpha
+    gem_surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    
+    # Draw the gem shape
+    if special_type == "line":
+        # Line-clearing gem (square with line)
+        pygame.draw.rect(gem_surface, color, (0, 0, size, size), border_radius=size//5)
+        pygame.draw.line(gem_surface, WHITE, (size//4, size//2), (size*3//4, size//2), 3)
+    elif special_type == "bomb":
+        # Explosive gem (circle)
+        pygame.draw.circle(gem_surface, color, (size//2, size//2), size//2)
+        # Add small white circles to indicate explosive
+        for i in range(4):
+            angle = i * math.pi / 2
+            x = size//2 + int(math.cos(angle) * size//3)
+            y = size//2 + int(math.sin(angle) * size//3)
+            pygame.draw.circle(gem_surface, WHITE, (x, y), size//10)
+    elif special_type == "color_bomb":
+        # Color bomb (star shape approximated by a circle with spikes)
+        pygame.draw.circle(gem_surface, color, (size//2, size//2), size//2)
+        # Add rainbow effect
+        for i in range(6):
+            angle = i * math.pi / 3
+            x1 = size//2
+            y1 = size//2
+            x2 = size//2 + int(math.cos(angle) * size//2)
+            y2 = size//2 + int(math.sin(angle) * size//2)
+            rainbow_color = RAINBOW_COLORS[i % len(RAINBOW_COLORS)]
+            pygame.draw.line(gem_surface, rainbow_color, (x1, y1), (x2, y2), 3)
+    else:
+        # Regular gem (rounded rectangle)
+        pygame.draw.rect(gem_surface, color, (0, 0, size, size), border_radius=size//5)
+    
+    # Add highlight for selected gems
+    if selected:
+        pygame.draw.rect(gem_surface, WHITE, (0, 0, size, size), 3, border_radius=size//5)
+    
+    return gem_surface
+
+def get_gem_sprite(gem_type, special_type, selected, scale):
+    scale_bucket = max(1, round(scale * SCALE_BUCKETS))
+    key = (gem_type, special_type, selected, scale_bucket)
+    sprite = gem_sprite_cache.get(key)
+    if sprite is None:
+        # Calculate size based on scale
+        size = int(CELL_SIZE * 0.8 * scale_bucket / SCALE_BUCKETS)
+        sprite = render_gem_sprite(gem_type, special_type, selected, size)
+        gem_sprite_cache[key] = sprite
+    return sprite
+
 class Gem:
-    def __init__(self, row, col, gem_type=None):
+    # Gems are pooled and reused, so keep them small and fixed-layout
+    __slots__ = ("row", "col", "gem_type", "x", "y", "prev_x", "prev_y", "target_x", "target_y", "is_moving",
+                 "is_special", "special_type", "is_selected", "is_hinted", "is_matched",
+                 "alpha", "scale", "drawn_rect", "drawn_state")
+
+    def __init__(self, row, col, gem_type):
+        self.reset(row, col, gem_type)
+        
+    def reset(self, row, col, gem_type):
+        # Put the gem back in its freshly created state, for reuse from the pool
         self.row = row
         self.col = col
-        self.gem_type = gem_type if gem_type else random.choice(list(GEM_COLORS.keys()))
+        self.gem_type = gem_type  # Chosen by the board's seeded generator
         self.x = GRID_OFFSET_X + col * CELL_SIZE
         self.y = GRID_OFFSET_Y + row * CELL_SIZE
+        self.prev_x = self.x  # Position before the last update, for interpolation
+        self.prev_y = self.y
         self.target_x = self.x
         self.target_y = self.y
         self.is_moving = False
         self.is_special = False
         self.special_type = None
         self.is_selected = False
+        self.is_hinted = False  # Part of the swap suggested by the hint button
         self.is_matched = False
         self.alpha = 255  # For fade animations
         self.scale = 1.0  # For scale animations
-        
-    def update(self):
-        # Handle movement animation
-        if self.is_moving:
-            dx = self.target_x - self.x
-            dy = self.target_y - self.y
+        self.drawn_rect = None  # Screen area covered when last drawn
+        self.drawn_state = None  # visual_state() when last drawn
+        
+    def update_move(self):
+        # One fixed step of movement towards the target; True once the gem has arrived
+        self.prev_x = self.x
+        self.prev_y = self.y
+        dx = self.target_x - self.x
+        dy = self.target_y - self.y
+        
+        if abs(dx) < ANIMATION_SPEED and abs(dy) < ANIMATION_SPEED:
+            self.x = self.target_x
+            self.y = self.target_y
+            return True
+        self.x += dx * 0.2
+        self.y += dy * 0.2
+        return False
+        
+    def update_fade(self):
+        # One fixed step of a matched gem fading out; True once it is invisible
+        self.alpha = max(0, self.alpha - 15)
+        self.scale = max(0.1, self.scale - 0.05)
+        return self.alpha == 0
             
-            if abs(dx) < ANIMATION_SPEED and abs(dy) < ANIMATION_SPEED:
-                self.x = self.target_x
-                self.y = self.target_y
-                self.is_moving = False
-            else:
-                self.x += dx * 0.2
-                self.y += dy * 0.2
-                
-        # Handle matched gems fading out
-        if self.is_matched:
-            self.alpha = max(0, self.alpha - 15)
-            self.scale = max(0.1, self.scale - 0.05)
-            
-    def draw(self):
-        color = GEM_COLORS[self.gem_type]
-        
-        # Apply alpha for fading
-        color_with_alpha = (*color, self.alpha)
-        
-        # Calculate size based on scale
-        size = int(CELL_SIZE * 0.8 * self.scale)
-        
-        # Create a surface with per-pixel alpha
-        gem_surface = pygame.Surface((size, size), pygame.SRCALPHA)
-        
-        # Draw the gem shape
-        if self.special_type == "line":
-            # Line-clearing gem (square with line)
-            pygame.draw.rect(gem_surface, color_with_alpha, (0, 0, size, size), border_radius=size//5)
-            pygame.draw.line(gem_surface, WHITE, (size//4, size//2), (size*3//4, size//2), 3)
-        elif self.special_type == "bomb":
-            # Explosive gem (circle)
-            pygame.draw.circle(gem_surface, color_with_alpha, (size//2, size//2), size//2)
-            # Add small white circles to indicate explosive
-            for i in range(4):
-                angle = i * math.pi / 2
-                x = size//2 + int(math.cos(angle) * size//3)
-                y = size//2 + int(math.sin(angle) * size//3)
-                pygame.draw.circle(gem_surface, WHITE, (x, y), size//10)
-        elif self.special_type == "color_bomb":
-            # Color bomb (star shape approximated by a circle with spikes)
-            pygame.draw.circle(gem_surface, color_with_alpha, (size//2, size//2), size//2)
-            # Add rainbow effect
-            for i in range(6):
-                angle = i * math.pi / 3
-                x1 = size//2
-                y1 = size//2
-                x2 = size//2 + int(math.cos(angle) * size//2)
-                y2 = size//2 + int(math.sin(angle) * size//2)
-                rainbow_color = list(GEM_COLORS.values())[i % len(GEM_COLORS)]
-                pygame.draw.line(gem_surface, rainbow_color, (x1, y1), (x2, y2), 3)
-        else:
-            # Regular gem (rounded rectangle)
-            pygame.draw.rect(gem_surface, color_with_alpha, (0, 0, size, size), border_radius=size//5)
-        
-        # Add highlight for selected gems
-        if self.is_selected:
-            pygame.draw.rect(gem_surface, WHITE, (0, 0, size, size), 3, border_radius=size//5)
+    def render_position(self, blend=1.0):
+        # Position between the last two updates; blend is how far the frame is into the next step
+        if not self.is_moving:
+            return (self.x, self.y)
+        return (self.prev_x + (self.x - self.prev_x) * blend,
+                self.prev_y + (self.y - self.prev_y) * blend)
+        
+    def visual_state(self, blend=1.0):
+        # Everything that changes how the gem looks on screen
+        return (self.render_position(blend), self.gem_type, self.special_type, self.is_selected, self.is_hinted, self.alpha, self.scale)
+        
+    def sprite(self):
+        # Hinted gems get the same highlight as selected ones
+        return get_gem_sprite(self.gem_type, self.special_type, self.is_selected or self.is_hinted, self.scale)
+        
+    def screen_rect(self, blend=1.0):
+        # Area the gem covers when drawn, padded to cover rounding of fractional positions
+        size = self.sprite().get_width()
+        x, y = self.render_position(blend)
+        pos_x = x + (CELL_SIZE - size) // 2
+        pos_y = y + (CELL_SIZE - size) // 2
+        return pygame.Rect(int(pos_x) - 1, int(pos_y) - 1, size + 2, size + 2)
+        
+    def draw(self, blend=1.0):
+        # Blit the cached sprite for this look, faded with surface alpha
+        gem_surface = self.sprite()
+        gem_surface.set_alpha(self.alpha)
+        size = gem_surface.get_width()
         
         # Calculate position to center the gem in its cell
-        pos_x = self.x + (CELL_SIZE - size) // 2
-        pos_y = self.y + (CELL_SIZE - size) // 2
+        x, y = self.render_position(blend)
+        pos_x = x + (CELL_SIZE - size) // 2
+        pos_y = y + (CELL_SIZE - size) // 2
         
         # Draw the gem
         screen.blit(gem_surface, (pos_x, pos_y))
+        self.drawn_rect = self.screen_rect(blend)
+        self.drawn_state = self.visual_state(blend)
         
     def set_position(self, row, col):
+        # Set the cell the gem belongs in; start a "move" tween to animate it there
         self.row = row
         self.col = col
         self.target_x = GRID_OFFSET_X + col * CELL_SIZE
         self.target_y = GRID_OFFSET_Y + row * CELL_SIZE
-        self.is_moving = True
         
     def move_to(self, x, y):
         self.target_x = x
         self.target_y = y
-        self.is_moving = True
         
     def make_special(self, special_type):
         self.is_special = True
         self.special_type = special_type
 
-class Board:
+class TweenScheduler:
+    # Runs gem animations in one place. Only gems with an active tween are
+    # stepped, so idle gems cost nothing per frame, and a running count of
+    # movement tweens answers "is anything moving?" without scanning the grid.
     def __init__(self):
+        self.active = {}  # (gem, kind) -> completion callbacks, in start order
+        self.moving = 0  # Active "move" tweens
+        
+    def start(self, gem, kind, on_complete=None):
+        # kind is "move" (towards the gem's target) or "fade" (a matched gem
+        # fading out). Starting a tween that is already running just adds the
+        # callback, which is called with no arguments when it completes.
+        key = (gem, kind)
+        callbacks = self.active.get(key)
+        if callbacks is None:
+            callbacks = self.active[key] = []
+            if kind == "move":
+                # Interpolate from where the gem is now, not from wherever
+                # its last move left prev_x and prev_y
+                gem.prev_x = gem.x
+                gem.prev_y = gem.y
+                gem.is_moving = True
+                self.moving += 1
+        if on_complete:
+            callbacks.append(on_complete)
+            
+    def is_moving(self):
+        return self.moving > 0
+        
+    def update(self):
+        # Advance every active tween by one fixed step
+        finished = []
+        for key in self.active:
+            gem, kind = key
+            done = gem.update_move() if kind == "move" else gem.update_fade()
+            if done:
+                finished.append(key)
+        
+        # Callbacks run after the step, so they can safely start new tweens
+        for key in finished:
+            gem, kind = key
+            callbacks = self.active.pop(key)
+            if kind == "move":
+                gem.is_moving = False
+                self.moving -= 1
+            for callback in callbacks:
+                callback()
+
+class GemPool:
+    # Recycles Gem objects: cleared gems go back to the pool and refills take
+    # them out again, so cascades don't allocate and the garbage collector has
+    # nothing to pause for mid-animation. The board always holds the same
+    # number of gems, so once it is full every refill is served from the pool.
+    def __init__(self):
+        self.free = []
+        self.allocations = 0  # Gems created because the pool was empty
+        self.reuses = 0  # Gems handed out again from the pool
+        
+    def acquire(self, row, col, gem_type):
+        if self.free:
+            self.reuses += 1
+            gem = self.free.pop()
+            gem.reset(row, col, gem_type)
+            return gem
+        self.allocations += 1
+        return Gem(row, col, gem_type)
+        
+    def release(self, gem):
+        self.free.append(gem)
+
+# Static board background
+# The window fill and the checkerboard grid never change, so they are composed
+# once and each frame starts with a single blit of this surface.
+board_background = None
+
+def get_board_background():
+    global board_background
+    if board_background is None:
+        board_background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        board_background.fill(BACKGROUND_COLOR)
+        for row in range(GRID_SIZE):
+            for col in range(GRID_SIZE):
+                x = GRID_OFFSET_X + col * CELL_SIZE
+                y = GRID_OFFSET_Y + row * CELL_SIZE
+                color = GRAY if (row + col) % 2 == 0 else BLACK
+                pygame.draw.rect(board_background, color, (x, y, CELL_SIZE, CELL_SIZE))
+                pygame.draw.rect(board_background, WHITE, (x, y, CELL_SIZE, CELL_SIZE), 1)
+        
+        # The hint button never changes either
+        pygame.draw.rect(board_background, GRAY, HINT_BUTTON_RECT, border_radius=8)
+        pygame.draw.rect(board_background, WHITE, HINT_BUTTON_RECT, 2, border_radius=8)
+        hint_text = small_font.render("Hint (H)", True, WHITE)
+        board_background.blit(hint_text, hint_text.get_rect(center=HINT_BUTTON_RECT.center))
+        board_background = board_background.convert()
+    return board_background
+
+class Board:
+    def __init__(self, seed=None):
         self.grid = [[None for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+        self.engine = BoardEngine(GRID_SIZE, GRID_SIZE, GEM_COLORS.keys(), seed=seed)  # Board logic; grid holds the Gem sprites
         self.selected_gem = None
         self.swapping_gems = None
+        self.player_swap = None  # Player swap waiting to be confirmed by a match
         self.is_checking_matches = False
         self.is_refilling = False
+        self.pending_clear = None  # ClearPlan whose gems are fading out
         self.score = 0
         self.moves_left = 30
         self.level = 1
+        self.replay = ReplayLog(self.engine.seed, GRID_SIZE, GRID_SIZE, self.moves_left)  # Seed plus moves, to reproduce this game
         self.gems_to_remove = []  # Track gems that need to be removed
+        self.hud_text = {}  # HUD line -> (value, rendered text surface)
+        self.drawn_hud = []  # (text surface, screen rect) of each HUD line as last drawn
+        self.removed_rects = []  # Screen areas of gems removed since the last draw
+        self.gem_pool = GemPool()  # Cleared gems, reused by refills
+        self.tweens = TweenScheduler()  # Active gem animations
+        self.fading = 0  # Cleared gems still fading out
+        self.cascades = 0  # Match steps since the player's last swap
         self.initialize_board()
+        self.move_index = MoveIndex(self.engine)  # Every swap that would make a match
+        self.hinted_gems = []
+        if not self.move_index.has_moves():
+            self.reshuffle()
         
     def initialize_board(self):
-        # Create initial gems
+        # Create initial gems, with no initial matches
+        self.engine.fill_initial()
         for row in range(GRID_SIZE):
             for col in range(GRID_SIZE):
-                # Create a gem with a random type, but ensure no initial matches
-                gem_type = self.get_random_gem_type(row, col)
-                self.grid[row][col] = Gem(row, col, gem_type)
+                self.grid[row][col] = self.gem_pool.acquire(row, col, self.engine.get_type(row, col))
                 
     def get_random_gem_type(self, row, col):
         # Get a random gem type that doesn't create an initial match
-        available_types = list(GEM_COLORS.keys())
-        
-        # Check horizontal matches
-        if col >= 2:
-            if self.grid[row][col-1] and self.grid[row][col-2]:
-                if self.grid[row][col-1].gem_type == self.grid[row][col-2].gem_type:
-                    if self.grid[row][col-1].gem_type in available_types:
-                        available_types.remove(self.grid[row][col-1].gem_type)
-        
-        # Check vertical matches
-        if row >= 2:
-            if self.grid[row-1][col] and self.grid[row-2][col]:
-                if self.grid[row-1][col].gem_type == self.grid[row-2][col].gem_type:
-                    if self.grid[row-1][col].gem_type in available_types:
-                        available_types.remove(self.grid[row-1][col].gem_type)
-        
-        # If no available types (rare case), just return a random one
-        if not available_types:
-            return random.choice(list(GEM_COLORS.keys()))
-            
-        return random.choice(available_types)
+        return self.engine.gem_types[self.engine.random_gem(row, col)]
         
     def update(self):
-        # Update all gems
-        any_moving = False
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                if self.grid[row][col]:
-                    self.grid[row][col].update()
-                    if self.grid[row][col].is_moving:
-                        any_moving = True
-        
-        # Handle swapping animation
-        if self.swapping_gems:
-            gem1, gem2 = self.swapping_gems
-            if not gem1.is_moving and not gem2.is_moving:
-                # Swap completed
-                self.grid[gem1.row][gem1.col] = gem1
-                self.grid[gem2.row][gem2.col] = gem2
-                self.swapping_gems = None
-                self.is_checking_matches = True
+        # Step the animating gems; finished swaps and fades call back into the board
+        self.tweens.update()
+        any_moving = self.tweens.is_moving()
         
         # Check for matches after animations complete
         if self.is_checking_matches and not any_moving:
             matches = self.find_matches()
             if matches:
-                self.handle_matches(matches)
+                swapped = [(gem.row, gem.col) for gem in self.player_swap] if self.player_swap else ()
+                self.player_swap = None
+                self.handle_matches(matches, swapped)
             else:
                 # If no matches after a swap, swap back if this was from a player swap
-                if self.swapping_gems:
-                    gem1, gem2 = self.swapping_gems
+                if self.player_swap:
+                    gem1, gem2 = self.player_swap
+                    self.player_swap = None
                     self.swap_gems(gem1, gem2)
-                    self.swapping_gems = None
                 self.is_checking_matches = False
-        
-        # Remove matched gems if their animation is complete
-        self.remove_completed_matches()
+                
+                # The board has settled: catch the move index up and reshuffle if deadlocked
+                self.move_index.update()
+                if not self.move_index.has_moves():
+                    self.reshuffle()
         
         # Handle falling gems and refilling
-        if not any_moving and not self.is_checking_matches:
+        if not any_moving and not self.is_checking_matches and not self.pending_clear:
             if self.apply_gravity():
                 # Gems are falling
                 pass
@@ -239,49 +391,156 @@ class Board:
                 self.is_refilling = False
                 self.is_checking_matches = True  # Check for new matches after refilling
         
-    def remove_completed_matches(self):
-        # Remove gems that have completed their fade-out animation
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                if self.grid[row][col] and self.grid[row][col].is_matched and self.grid[row][col].alpha <= 0:
-                    self.grid[row][col] = None
-                    self.is_refilling = True  # Set flag to apply gravity and refill
+    def finish_swap(self):
+        # Called as each swapping gem arrives; the swap is done when both have
+        gem1, gem2 = self.swapping_gems
+        if gem1.is_moving or gem2.is_moving:
+            return
+        self.swapping_gems = None
+        self.is_checking_matches = True
         
-    def draw(self):
-        # Draw the grid background
-        for row in range(GRID_SIZE):
-            for col in range(GRID_SIZE):
-                x = GRID_OFFSET_X + col * CELL_SIZE
-                y = GRID_OFFSET_Y + row * CELL_SIZE
-                color = GRAY if (row + col) % 2 == 0 else BLACK
-                pygame.draw.rect(screen, color, (x, y, CELL_SIZE, CELL_SIZE))
-                pygame.draw.rect(screen, WHITE, (x, y, CELL_SIZE, CELL_SIZE), 1)
+    def finish_fade(self):
+        # Called as each cleared gem fades out
+        self.fading -= 1
+        if self.fading == 0:
+            self.remove_completed_matches()
+        
+    def remove_completed_matches(self):
+        # Once every cleared gem has faded out, remove them all in one batch
+        plan = self.pending_clear
+        for row, col in plan.cleared:
+            if self.grid[row][col].drawn_rect:
+                self.removed_rects.append(self.grid[row][col].drawn_rect)
+            self.gem_pool.release(self.grid[row][col])
+            self.grid[row][col] = None
+        self.engine.apply_clear(plan)
+        self.pending_clear = None
+        self.is_refilling = True  # Set flag to apply gravity and refill
+        
+    def draw(self, blend=1.0):
+        # Draw the window background and grid, pre-composed once
+        screen.blit(get_board_background(), (0, 0))
+        self.removed_rects = []
         
         # Draw all gems
         for row in range(GRID_SIZE):
             for col in range(GRID_SIZE):
                 if self.grid[row][col]:
-                    self.grid[row][col].draw()
+                    self.grid[row][col].draw(blend)
         
         # Draw UI elements
         self.draw_ui()
         
-    def draw_ui(self):
-        # Draw score
-        score_text = font.render(f"Score: {self.score}", True, WHITE)
-        screen.blit(score_text, (20, 20))
+    def invalidate(self, rect):
+        # Repaint a screen area on the next draw_dirty, e.g. after drawing an overlay on it
+        self.removed_rects.append(rect)
         
-        # Draw moves left
-        moves_text = font.render(f"Moves: {self.moves_left}", True, WHITE)
-        screen.blit(moves_text, (20, 60))
+    def draw_dirty(self, blend=1.0):
+        # Repaint only the areas that changed since the last draw and return them,
+        # so the caller can present them with pygame.display.update(rects)
+        dirty_rects = self.removed_rects
+        self.removed_rects = []
         
-        # Draw level
-        level_text = font.render(f"Level: {self.level}", True, WHITE)
-        screen.blit(level_text, (WINDOW_WIDTH - 150, 20))
+        # Moving, fading, selected or new gems: cover where they were and where they are
+        for row in range(GRID_SIZE):
+            for col in range(GRID_SIZE):
+                gem = self.grid[row][col]
+                if gem and gem.drawn_state != gem.visual_state(blend):
+                    rect = gem.screen_rect(blend)
+                    dirty_rects.append(rect.union(gem.drawn_rect) if gem.drawn_rect else rect)
+        
+        # HUD lines that changed value or sit under a repainted area. The text is
+        # antialiased, so a line is always repainted whole rather than blitted twice.
+        hud_lines = self.hud_lines()
+        redraw_hud = [text for text, pos in hud_lines] != [text for text, rect in self.drawn_hud]
+        if not redraw_hud and dirty_rects:
+            redraw_hud = any(rect.collidelist(dirty_rects) != -1 for text, rect in self.drawn_hud)
+        if redraw_hud:
+            dirty_rects.extend(rect for text, rect in self.drawn_hud)
+            dirty_rects.extend(text.get_rect(topleft=pos) for text, pos in hud_lines)
+        
+        if not dirty_rects:
+            return []
+        
+        # Restore the background under every dirty area, then redraw what overlaps it
+        background = get_board_background()
+        for rect in dirty_rects:
+            screen.blit(background, rect, rect)
+        for row in range(GRID_SIZE):
+            for col in range(GRID_SIZE):
+                gem = self.grid[row][col]
+                if gem and gem.screen_rect(blend).collidelist(dirty_rects) != -1:
+                    gem.draw(blend)
+        if redraw_hud:
+            self.draw_ui()
+        
+        screen_rect = screen.get_rect()
+        return [rect.clip(screen_rect) for rect in dirty_rects if rect.colliderect(screen_rect)]
+        
+    def get_hud_text(self, key, label, value):
+        # Re-render a HUD line only when its value changes
+        cached = self.hud_text.get(key)
+        if cached is None or cached[0] != value:
+            cached = (value, font.render(f"{label}: {value}", True, WHITE))
+            self.hud_text[key] = cached
+        return cached[1]
+        
+    def hud_lines(self):
+        # Score, moves left and level, with their positions
+        return [
+            (self.get_hud_text("score", "Score", self.score), (20, 20)),
+            (self.get_hud_text("moves", "Moves", self.moves_left), (20, 60)),
+            (self.get_hud_text("level", "Level", self.level), (WINDOW_WIDTH - 150, 20)),
+        ]
+        
+    def draw_ui(self):
+        # Draw score, moves left and level
+        self.drawn_hud = [(text, screen.blit(text, pos)) for text, pos in self.hud_lines()]
+        
+    def is_busy(self):
+        return self.is_checking_matches or self.is_refilling or self.pending_clear is not None or self.tweens.is_moving()
+        
+    def show_hint(self):
+        # Highlight one swap that makes a match
+        if self.is_busy():
+            return
+        self.clear_hint()
+        move = self.move_index.hint()
+        if move:
+            row1, col1, row2, col2 = move
+            self.hinted_gems = [self.grid[row1][col1], self.grid[row2][col2]]
+            for gem in self.hinted_gems:
+                gem.is_hinted = True
+        
+    def clear_hint(self):
+        for gem in self.hinted_gems:
+            gem.is_hinted = False
+        self.hinted_gems = []
+        
+    def reshuffle(self):
+        # Rearrange a deadlocked board, sliding each gem to its new cell
+        self.clear_hint()
+        self.move_index.reshuffle()
+        gems_by_type = {}
+        for row in range(GRID_SIZE):
+            for col in range(GRID_SIZE):
+                gem = self.grid[row][col]
+                gems_by_type.setdefault((gem.gem_type, gem.special_type), []).append(gem)
+        for row in range(GRID_SIZE):
+            for col in range(GRID_SIZE):
+                gem = gems_by_type[(self.engine.get_type(row, col), self.engine.get_special(row, col))].pop()
+                self.grid[row][col] = gem
+                gem.set_position(row, col)
+                self.tweens.start(gem, "move")
         
     def handle_click(self, pos):
-        if self.is_checking_matches or self.is_refilling or any(self.grid[row][col] and self.grid[row][col].is_moving for row in range(GRID_SIZE) for col in range(GRID_SIZE)):
+        if self.is_busy():
             return  # Don't handle clicks during animations
+        
+        if HINT_BUTTON_RECT.collidepoint(pos):
+            self.show_hint()
+            return
+        self.clear_hint()
             
         # Convert click position to grid coordinates
         col = (pos[0] - GRID_OFFSET_X) // CELL_SIZE
@@ -297,7 +556,9 @@ class Board:
                 # Second selection - check if it's adjacent to the first
                 if self.are_adjacent(self.selected_gem, self.grid[row][col]):
                     # Swap the gems
+                    self.replay.record((self.selected_gem.row, self.selected_gem.col, row, col))
                     self.swap_gems(self.selected_gem, self.grid[row][col])
+                    self.player_swap = self.swapping_gems
                     self.moves_left -= 1
                     self.selected_gem.is_selected = False
                     self.selected_gem = None
@@ -313,7 +574,8 @@ class Board:
                (abs(gem1.col - gem2.col) == 1 and gem1.row == gem2.row)
                
     def swap_gems(self, gem1, gem2):
-        # Swap positions in the grid
+        # Swap positions in the grid and in the board logic
+        self.engine.swap(gem1.row, gem1.col, gem2.row, gem2.col)
         self.grid[gem1.row][gem1.col] = gem2
         self.grid[gem2.row][gem2.col] = gem1
         
@@ -327,97 +589,37 @@ class Board:
         gem2.target_x = GRID_OFFSET_X + gem2.col * CELL_SIZE
         gem2.target_y = GRID_OFFSET_Y + gem2.row * CELL_SIZE
         
-        gem1.is_moving = True
-        gem2.is_moving = True
-        
-        # Store the swapping gems to check for matches after animation
+        # Store the swapping gems to check for matches once both have arrived
         self.swapping_gems = (gem1, gem2)
+        self.tweens.start(gem1, "move", self.finish_swap)
+        self.tweens.start(gem2, "move", self.finish_swap)
         
     def find_matches(self):
-        matches = []
-        
-        # Check horizontal matches
-        for row in range(GRID_SIZE):
-            col = 0
-            while col < GRID_SIZE - 2:
-                if self.grid[row][col] and self.grid[row][col+1] and self.grid[row][col+2]:
-                    if self.grid[row][col].gem_type == self.grid[row][col+1].gem_type == self.grid[row][col+2].gem_type:
-                        # Found a horizontal match of at least 3
-                        match_length = 3
-                        while col + match_length < GRID_SIZE and self.grid[row][col+match_length] and \
-                              self.grid[row][col].gem_type == self.grid[row][col+match_length].gem_type:
-                            match_length += 1
-                        
-                        # Add the match to our list
-                        match = [(row, col+i) for i in range(match_length)]
-                        matches.append(match)
-                        col += match_length
-                    else:
-                        col += 1
-                else:
-                    col += 1
-        
-        # Check vertical matches
-        for col in range(GRID_SIZE):
-            row = 0
-            while row < GRID_SIZE - 2:
-                if self.grid[row][col] and self.grid[row+1][col] and self.grid[row+2][col]:
-                    if self.grid[row][col].gem_type == self.grid[row+1][col].gem_type == self.grid[row+2][col].gem_type:
-                        # Found a vertical match of at least 3
-                        match_length = 3
-                        while row + match_length < GRID_SIZE and self.grid[row+match_length][col] and \
-                              self.grid[row][col].gem_type == self.grid[row+match_length][col].gem_type:
-                            match_length += 1
-                        
-                        # Add the match to our list
-                        match = [(row+i, col) for i in range(match_length)]
-                        matches.append(match)
-                        row += match_length
-                    else:
-                        row += 1
-                else:
-                    row += 1
-        
-        # Check for L-shapes and other special patterns
-        self.check_special_patterns(matches)
-        
-        return matches
-        
-    def check_special_patterns(self, matches):
-        # This is a simplified version - in a full game, you'd check for T, L shapes, etc.
-        # For now, we'll just identify matches of 4 or 5 for special gems
-        
-        for match in matches:
-            if len(match) == 4:
-                # Mark the first gem in a 4-match for upgrade to line-clearing gem
-                row, col = match[0]
-                if self.grid[row][col]:
-                    self.grid[row][col].make_special("line")
-            elif len(match) == 5:
-                # Mark the first gem in a 5-match for upgrade to color bomb
-                row, col = match[0]
-                if self.grid[row][col]:
-                    self.grid[row][col].make_special("color_bomb")
-        
-    def handle_matches(self, matches):
-        # Mark matched gems
-        matched_positions = set()
-        for match in matches:
-            for row, col in match:
-                if self.grid[row][col]:
-                    self.grid[row][col].is_matched = True
-                    matched_positions.add((row, col))
-        
-        # Calculate score based on matches
-        match_count = len(matched_positions)
-        points = match_count * 10  # Base points
-        
-        # Bonus for longer matches
-        for match in matches:
-            if len(match) > 3:
-                points += (len(match) - 3) * 20  # Bonus for each gem beyond 3
+        # Runs are found on the engine's bitboards rather than by comparing gem_type strings.
+        # L and T shapes show up as a horizontal and a vertical run sharing a cell.
+        return self.engine.find_matches()
+        
+    def handle_matches(self, matches, swapped=()):
+        # The engine works out the whole step at once: runs of 4 and 5 and L/T
+        # shapes create specials, and specials caught in the clear set each
+        # other off. Everything cleared fades out together. As in the headless
+        # game, long cascades stop making new specials.
+        self.cascades = 1 if swapped else self.cascades + 1
+        plan = self.engine.plan_clear(matches, swapped, self.cascades <= SPECIAL_CASCADE_LIMIT)
+        for row, col in plan.cleared:
+            self.grid[row][col].is_matched = True
+            self.tweens.start(self.grid[row][col], "fade", self.finish_fade)
+        self.fading = len(plan.cleared)
+        for row, col, special in plan.created:
+            self.grid[row][col].make_special(special)
+        self.pending_clear = plan
+        self.is_checking_matches = False
+        if not self.fading:
+            # No fade will call finish_fade, so finish the step now
+            self.remove_completed_matches()
         
-        self.score += points
+        # Same scoring as the headless simulation
+        self.score += plan.points
         
     def remove_matched_gems(self):
         # This method is no longer needed as we're removing gems in remove_completed_matches
@@ -426,82 +628,124 @@ class Board:
         
     def apply_gravity(self):
         # Move gems down to fill empty spaces
-        moved = False
-        for col in range(GRID_SIZE):
-            for row in range(GRID_SIZE-1, -1, -1):
-                if self.grid[row][col] is None:
-                    # Find the highest gem above this empty space
-                    for above_row in range(row-1, -1, -1):
-                        if self.grid[above_row][col]:
-                            # Move this gem down
-                            self.grid[row][col] = self.grid[above_row][col]
-                            self.grid[above_row][col] = None
-                            self.grid[row][col].set_position(row, col)
-                            moved = True
-                            break
-        return moved
+        moves = self.engine.apply_gravity()
+        for from_row, to_row, col in moves:
+            self.grid[to_row][col] = self.grid[from_row][col]
+            self.grid[from_row][col] = None
+            self.grid[to_row][col].set_position(to_row, col)
+            self.tweens.start(self.grid[to_row][col], "move")
+        return bool(moves)
         
     def refill_board(self):
         # Add new gems to empty spaces at the top
-        for col in range(GRID_SIZE):
-            for row in range(GRID_SIZE):
-                if self.grid[row][col] is None:
-                    # Create a new gem above the board
-                    new_gem = Gem(row, col)
-                    new_gem.y = GRID_OFFSET_Y - CELL_SIZE * (row + 1)  # Start higher for a nicer falling effect
-                    new_gem.target_y = GRID_OFFSET_Y + row * CELL_SIZE
-                    new_gem.is_moving = True
-                    self.grid[row][col] = new_gem
+        for row, col, gem in self.engine.refill():
+            # Take a gem from the pool and start it above the board
+            new_gem = self.gem_pool.acquire(row, col, self.engine.gem_types[gem])
+            new_gem.y = GRID_OFFSET_Y - CELL_SIZE * (row + 1)  # Start higher for a nicer falling effect
+            new_gem.target_y = GRID_OFFSET_Y + row * CELL_SIZE
+            self.grid[row][col] = new_gem
+            self.tweens.start(new_gem, "move")
         
     def check_game_over(self):
-        return self.moves_left <= 0
+        # Let the last move's cascades finish before ending the game
+        return self.moves_left <= 0 and not self.is_busy()
 
 def main():
     board = Board()
     running = True
     game_over = False
+    full_redraw = True  # Repaint the whole window on the next frame
+    accumulator = 0  # Milliseconds of game time not yet simulated
+    profiler = FrameProfiler()  # F3 shows frame timings, F4 records a Chrome trace
 
     while running:
+        # Cap the frame rate; the time since the last frame is what the board simulates
+        accumulator += clock.tick(60)
+        profiler.begin_frame()
+        
         # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN and not game_over:
-                board.handle_click(event.pos)
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
+        with profiler.phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
                     running = False
-                elif event.key == pygame.K_r:
-                    # Reset the game
-                    board = Board()
-                    game_over = False
+                elif event.type == pygame.MOUSEBUTTONDOWN and not game_over:
+                    board.handle_click(event.pos)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_h and not game_over:
+                        board.show_hint()
+                    elif event.key == pygame.K_s:
+                        # Save a replay of this game, e.g. to attach to a bug report
+                        board.replay.save(f"gem_fusion_{board.engine.seed}.replay")
+                    elif event.key == pygame.K_r:
+                        # Reset the game
+                        board = Board()
+                        game_over = False
+                        full_redraw = True
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
+                        full_redraw = True
+                    elif event.key == pygame.K_F4:
+                        if profiler.tracing:
+                            profiler.stop_trace("gem_fusion_trace.json")
+                        else:
+                            profiler.start_trace()
 
-        # Game logic
-        if not game_over:
-            board.update()
-            game_over = board.check_game_over()
+        # Game logic, in fixed steps for however much time has passed
+        with profiler.phase("update"):
+            steps = 0
+            while accumulator >= STEP_MS and not game_over:
+                if steps == MAX_STEPS_PER_FRAME:
+                    accumulator = 0
+                    break
+                board.update()
+                accumulator -= STEP_MS
+                steps += 1
+                game_over = board.check_game_over()
+                if game_over:
+                    full_redraw = True
+            blend = accumulator / STEP_MS if not game_over else 1.0
 
-        # Drawing
-        screen.fill(BACKGROUND_COLOR)
-        board.draw()
-        
-        if game_over:
-            # Display game over screen
-            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 180))  # Semi-transparent black
-            screen.blit(overlay, (0, 0))
-            
-            font_large = pygame.font.Font(None, 72)
-            game_over_text = font_large.render('Game Over!', True, WHITE)
-            score_text = font.render(f'Final Score: {board.score}', True, WHITE)
-            restart_text = font.render('Press R to Restart', True, WHITE)
+        # Drawing: repaint and present only what changed, and nothing at all when idle.
+        # The game over screen is redrawn whole while the profiler HUD is up,
+        # as the HUD area is repainted from the board.
+        with profiler.phase("draw"):
+            full_frame = full_redraw or (game_over and profiler.visible)
+            if full_frame:
+                board.draw(blend)
+                
+                if game_over:
+                    # Display game over screen
+                    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+                    overlay.fill((0, 0, 0, 180))  # Semi-transparent black
+                    screen.blit(overlay, (0, 0))
+                    
+                    font_large = pygame.font.Font(None, 72)
+                    game_over_text = font_large.render('Game Over!', True, WHITE)
+                    score_text = font.render(f'Final Score: {board.score}', True, WHITE)
+                    restart_text = font.render('Press R to Restart', True, WHITE)
+                    
+                    screen.blit(game_over_text, (WINDOW_WIDTH//2 - game_over_text.get_width()//2, WINDOW_HEIGHT//2 - 80))
+                    screen.blit(score_text, (WINDOW_WIDTH//2 - score_text.get_width()//2, WINDOW_HEIGHT//2))
+                    screen.blit(restart_text, (WINDOW_WIDTH//2 - restart_text.get_width()//2, WINDOW_HEIGHT//2 + 60))
+                full_redraw = False
+            else:
+                dirty_rects = board.draw_dirty(blend)
             
-            screen.blit(game_over_text, (WINDOW_WIDTH//2 - game_over_text.get_width()//2, WINDOW_HEIGHT//2 - 80))
-            screen.blit(score_text, (WINDOW_WIDTH//2 - score_text.get_width()//2, WINDOW_HEIGHT//2))
-            screen.blit(restart_text, (WINDOW_WIDTH//2 - restart_text.get_width()//2, WINDOW_HEIGHT//2 + 60))
+            # The profiler HUD goes on top; its area is repainted from the board next frame
+            hud_rect = profiler.draw(screen, "bottomright")
+            if hud_rect:
+                board.invalidate(hud_rect)
+                if not full_frame:
+                    dirty_rects.append(hud_rect)
 
-        pygame.display.flip()
-        clock.tick(60)
+        with profiler.phase("flip"):
+            if full_frame:
+                pygame.display.flip()
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
+        profiler.end_frame()
 
     pygame.quit()
     sys.exit()
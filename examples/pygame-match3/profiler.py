@@ -0,0 +1,227 @@
+"""
+Per-frame profiling for the pygame main loop.
+
+FrameProfiler splits each frame into named phases (events, update, draw,
+flip), keeps rolling p50/p95/p99 times for each, counts memory blocks
+allocated and garbage collections per frame, and can record a Chrome trace
+(load it in chrome://tracing or https://ui.perfetto.dev).
+
+    profiler = FrameProfiler()
+    while running:
+        profiler.begin_frame()
+        with profiler.phase("events"):
+            ...
+        with profiler.phase("update"):
+            ...
+        profiler.end_frame()
+"""
+import gc
+import json
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Phases shown on the HUD, in frame order
+PHASES = ("events", "update", "draw", "flip")
+
+
+def percentile(sorted_values, fraction):
+    """
+    Get the value a fraction of the way through a sorted list, e.g. 0.95 for
+    p95.
+    """
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame and shows them on an optional HUD.
+    """
+
+    def __init__(self, window=240, max_trace_events=200000):
+        """
+        Initialize the profiler.
+
+        Args:
+            window: Number of recent frames the percentiles are taken over
+            max_trace_events: Most events a trace keeps; older ones are dropped
+        """
+        self.visible = False
+        self.times = {name: deque(maxlen=window) for name in PHASES + ("frame",)}
+        self.allocations = deque(maxlen=window)
+        self.collections = deque(maxlen=window)
+        self.frames = 0
+
+        self.tracing = False
+        self.trace_events = deque(maxlen=max_trace_events)
+        self.origin = time.perf_counter()
+
+        self.frame_start = None
+        self.frame_phases = {}  # Milliseconds spent in each phase this frame
+        self.frame_blocks = 0
+        self.frame_collections = 0
+        self.hud_surface = None
+        self.hud_frame = -1
+        self.font = None
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self.frame_collections += 1
+
+    def close(self):
+        """
+        Detach from the garbage collector.
+        """
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def start_trace(self):
+        self.trace_events.clear()
+        self.tracing = True
+
+    def stop_trace(self, path):
+        """
+        Stop recording and write the trace as Chrome-trace JSON.
+
+        Args:
+            path: File to write
+        """
+        self.tracing = False
+        self.save_trace(path)
+
+    def save_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": list(self.trace_events), "displayTimeUnit": "ms"}, f)
+
+    def _record(self, name, start, end, category):
+        self.trace_events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": 0,
+            "tid": 0,
+        })
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.frame_phases = {}
+        self.frame_blocks = sys.getallocatedblocks()
+        self.frame_collections = 0
+
+    def end_frame(self):
+        """
+        Finish the current frame and add it to the rolling statistics.
+        """
+        end = time.perf_counter()
+        self.times["frame"].append((end - self.frame_start) * 1000)
+        for name in PHASES:
+            self.times[name].append(self.frame_phases.get(name, 0.0))
+        for name, elapsed in self.frame_phases.items():
+            if name not in PHASES:
+                self.times.setdefault(name, deque(maxlen=self.allocations.maxlen)).append(elapsed)
+        self.allocations.append(sys.getallocatedblocks() - self.frame_blocks)
+        self.collections.append(self.frame_collections)
+        if self.tracing:
+            self._record("frame", self.frame_start, end, "frame")
+        self.frames += 1
+
+    @contextmanager
+    def phase(self, name, label=None):
+        """
+        Time a phase of the current frame. A phase entered several times in
+        one frame counts the total.
+
+        Args:
+            name: The phase, one of PHASES for the HUD
+            label: More specific name for the trace, e.g. "DraftingScreen.update"
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.frame_phases[name] = self.frame_phases.get(name, 0.0) + (end - start) * 1000
+            if self.tracing:
+                self._record(label or name, start, end, name)
+
+    def stats(self):
+        """
+        Get rolling statistics over the recent frames.
+
+        Returns:
+            A dict mapping each phase (and "frame") to its p50, p95 and p99
+            times in milliseconds, plus "allocations" and "collections" per
+            frame as p50/p95/p99 too
+        """
+        stats = {}
+        series = dict(self.times, allocations=self.allocations, collections=self.collections)
+        for name, values in series.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            stats[name] = {
+                "p50": percentile(ordered, 0.50),
+                "p95": percentile(ordered, 0.95),
+                "p99": percentile(ordered, 0.99),
+            }
+        return stats
+
+    def hud_lines(self):
+        stats = self.stats()
+        lines = ["phase     p50    p95    p99 ms"]
+        for name in ("frame",) + PHASES:
+            if name in stats:
+                s = stats[name]
+                lines.append(f"{name:<7} {s['p50']:6.2f} {s['p95']:6.2f} {s['p99']:6.2f}")
+        if "allocations" in stats:
+            s = stats["allocations"]
+            lines.append(f"blocks  {s['p50']:6d} {s['p95']:6d} {s['p99']:6d}")
+            lines.append(f"gc runs {sum(self.collections):6d} in {len(self.collections)} frames")
+        if self.tracing:
+            lines.append(f"tracing: {len(self.trace_events)} events")
+        return lines
+
+    def draw(self, surface, corner="topright", margin=10, refresh_every=15):
+        """
+        Draw the HUD if it is visible.
+
+        The text is re-rendered every few frames rather than every frame, so
+        the HUD barely shows up in the times it reports.
+
+        Args:
+            surface: The surface to draw on, usually the display
+            corner: The corner of the surface to draw in, as a pygame.Rect
+                attribute name such as "topright" or "bottomleft"
+            margin: Distance from the edges of the surface
+
+        Returns:
+            The screen area drawn over, or None if the HUD is hidden
+        """
+        if not self.visible:
+            return None
+        # Imported here so the timing side, and percentile, work without pygame
+        import pygame
+        if self.hud_surface is None or self.frames - self.hud_frame >= refresh_every:
+            if self.font is None:
+                self.font = pygame.font.SysFont("monospace", 14)
+            rendered = [self.font.render(line, True, (230, 230, 230)) for line in self.hud_lines()]
+            width = max(text.get_width() for text in rendered) + 12
+            height = sum(text.get_height() for text in rendered) + 12
+            self.hud_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+            self.hud_surface.fill((0, 0, 0, 190))
+            y = 6
+            for text in rendered:
+                self.hud_surface.blit(text, (6, y))
+                y += text.get_height()
+            self.hud_frame = self.frames
+        rect = self.hud_surface.get_rect()
+        setattr(rect, corner, getattr(surface.get_rect().inflate(-2 * margin, -2 * margin), corner))
+        return surface.blit(self.hud_surface, rect)
@@ -0,0 +1,109 @@
+import struct
+
+# File layout: a fixed header, then one little-endian uint16 per move
+MAGIC = b"GFQR"
+VERSION = 2
+HEADER = struct.Struct("<4sBBBHQB")  # magic, version, rows, cols, starting moves, seed, engine
+MOVE = struct.Struct("<H")
+
+# Board engines a game can be played on, by the code stored in the header.
+# The engines draw their gems from different generators, so a game only
+# replays on the engine it was recorded with.
+ENGINES = ("bitboard", "numpy")
+
+# Move directions, stored in the low bit of each move
+RIGHT = 0
+DOWN = 1
+
+
+class ReplayLog:
+    """
+    Compact binary record of a game: the board seed plus every swap played.
+
+    Because the board draws all of its gems from a generator seeded with this
+    seed, replaying the moves on a fresh board rebuilds the exact game.
+    """
+
+    def __init__(self, seed, rows=8, cols=8, moves=30, engine="bitboard"):
+        """
+        Initialize an empty log.
+
+        Args:
+            seed: The seed the board's generator was created with
+            rows: Number of rows on the board
+            cols: Number of columns on the board
+            moves: Number of moves the game started with
+            engine: The board engine the game is played on, one of ENGINES
+        """
+        # The header stores rows and cols in a byte each, the starting moves in
+        # 16 bits and the seed in 64, and a move's cell index has 15 bits
+        if not (0 < rows <= 0xFF and 0 < cols <= 0xFF) or rows * cols > 1 << 15:
+            raise ValueError(f"Board of {rows}x{cols} is too large to record")
+        if not 0 <= moves <= 0xFFFF:
+            raise ValueError(f"Cannot record a game of {moves} moves")
+        if not 0 <= seed < 1 << 64:
+            raise ValueError(f"Seed {seed} does not fit in 64 bits")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown board engine {engine!r}")
+        self.seed = seed
+        self.rows = rows
+        self.cols = cols
+        self.start_moves = moves
+        self.engine = engine
+        self.moves = []
+
+    def record(self, move):
+        """
+        Record a swap.
+
+        Args:
+            move: A (row1, col1, row2, col2) tuple naming two adjacent cells
+        """
+        row1, col1, row2, col2 = move
+        if (row2, col2) < (row1, col1):
+            row1, col1, row2, col2 = row2, col2, row1, col1
+        self.moves.append((row1, col1, row2, col2))
+
+    def to_bytes(self):
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.start_moves, self.seed,
+                                     ENGINES.index(self.engine)))
+        for row1, col1, row2, col2 in self.moves:
+            direction = RIGHT if row1 == row2 else DOWN
+            data += MOVE.pack((row1 * self.cols + col1) << 1 | direction)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Load a log written by to_bytes.
+
+        Raises:
+            ValueError: If the data is not a replay log of a supported version
+        """
+        if len(data) < HEADER.size or (len(data) - HEADER.size) % MOVE.size:
+            raise ValueError("Replay data is truncated")
+        magic, version, rows, cols, moves, seed, engine_code = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a replay log")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        if engine_code >= len(ENGINES):
+            raise ValueError(f"Unknown board engine code {engine_code}")
+
+        log = cls(seed, rows, cols, moves, ENGINES[engine_code])
+        for (value,) in MOVE.iter_unpack(data[HEADER.size:]):
+            row, col = divmod(value >> 1, cols)
+            if value & 1 == RIGHT:
+                log.moves.append((row, col, row, col + 1))
+            else:
+                log.moves.append((row, col, row + 1, col))
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,242 @@
+"""
+Monte Carlo solver and level-difficulty estimator for Gem Fusion Quest.
+
+Plays many randomized headless games per level configuration with a choice
+of policies, spread across a process pool, and reports the score
+distribution of each configuration so designers can tune levels overnight.
+
+Usage:
+    python solver.py --moves 20 30 --gems 4 5 6 --policy greedy --games 500
+    python solver.py --levels levels.json --policy lookahead --target 1500 --json results.json
+
+A levels file is a JSON list of objects with "name", "moves", "gems", "rows"
+and "cols" keys; any key left out takes its default.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from board_engine import GEM_TYPES
+from headless import HeadlessGame, evaluate_moves, make_move_index, resolve_cascade
+from profiler import percentile
+
+# A level configuration to estimate
+#   name: Label used in reports
+#   moves: Moves the player starts with
+#   gems: Number of gem types in play (the first gems of GEM_TYPES)
+#   rows, cols: Board size
+LevelConfig = namedtuple("LevelConfig", ["name", "moves", "gems", "rows", "cols"])
+
+
+def simulate_move(engine, move, rng):
+    """
+    Score a swap, including its full cascade, on a copy of the board.
+
+    Refills on the copy come from a generator seeded from rng, so a policy
+    never sees the gems the real game is going to drop.
+
+    Returns:
+        The points the swap would score, and the board after it
+    """
+    board = engine.copy()
+    board.reseed(rng.getrandbits(64))
+    row1, col1, row2, col2 = move
+    board.swap(row1, col1, row2, col2)
+    points, _, _ = resolve_cascade(board, board.find_matches(), ((row1, col1), (row2, col2)))
+    return points, board
+
+
+def random_policy(game, rng):
+    """
+    Play a random valid swap.
+    """
+    moves = game.valid_moves()
+    return rng.choice(moves) if moves else game.random_move(rng)
+
+
+def greedy_policy(game, rng):
+    """
+    Play the valid swap that scores the most right now.
+    """
+    moves = game.valid_moves()
+    if not moves:
+        return game.random_move(rng)
+    rng.shuffle(moves)  # Break ties randomly
+    evaluations = evaluate_moves(game.engine, moves, seed=rng.getrandbits(64))
+    return max(evaluations, key=lambda evaluation: evaluation.points).move
+
+
+def lookahead_policy(game, rng, candidates=5):
+    """
+    Play the swap with the best two-move total, looking one greedy move ahead
+    from the best few candidates.
+    """
+    moves = game.valid_moves()
+    if not moves:
+        return game.random_move(rng)
+    rng.shuffle(moves)
+
+    scored = []
+    for move in moves:
+        points, board = simulate_move(game.engine, move, rng)
+        scored.append((points, move, board))
+    scored.sort(key=lambda entry: entry[0], reverse=True)
+
+    best_move = scored[0][1]
+    best_total = -1
+    for points, move, board in scored[:candidates]:
+        follow_up = 0
+        if game.moves_left > 1:
+            for next_move in make_move_index(board).moves:
+                follow_up = max(follow_up, simulate_move(board, next_move, rng)[0])
+        if points + follow_up > best_total:
+            best_total = points + follow_up
+            best_move = move
+    return best_move
+
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "lookahead": lookahead_policy,
+}
+
+
+def play_games(config, policy_name, games, seed):
+    """
+    Play a batch of games for one configuration. Runs in a worker process.
+
+    Returns:
+        A list of final scores
+    """
+    policy = POLICIES[policy_name]
+    rng = random.Random(seed)
+    scores = []
+    for _ in range(games):
+        game = HeadlessGame(config.rows, config.cols, config.moves, GEM_TYPES[:config.gems],
+                            seed=rng.getrandbits(64))
+        while not game.is_game_over():
+            game.step(policy(game, rng))
+        scores.append(game.score)
+    return scores
+
+
+def summarize(config, scores, target=None):
+    """
+    Summarize the score distribution of one configuration.
+    """
+    scores = sorted(scores)
+    summary = {
+        "level": config._asdict(),
+        "games": len(scores),
+        "mean": statistics.mean(scores),
+        "stdev": statistics.pstdev(scores),
+        "min": scores[0],
+        "p10": percentile(scores, 0.10),
+        "p50": percentile(scores, 0.50),
+        "p90": percentile(scores, 0.90),
+        "max": scores[-1],
+    }
+    if target is not None:
+        # Share of games that reach the target: a direct difficulty estimate
+        summary["target"] = target
+        summary["success_rate"] = sum(1 for score in scores if score >= target) / len(scores)
+    return summary
+
+
+def estimate(configs, policy_name="greedy", games=200, workers=None, seed=None, target=None, batch_size=25):
+    """
+    Estimate score distributions for level configurations across a process pool.
+
+    Args:
+        configs: The LevelConfigs to estimate
+        policy_name: Key into POLICIES
+        games: Games to play per configuration
+        workers: Worker processes, or None for one per CPU
+        seed: Seed for reproducible runs, or None
+        target: Optional score target to report a success rate for
+        batch_size: Games per task sent to a worker
+
+    Returns:
+        A list of summaries, one per configuration
+    """
+    rng = random.Random(seed)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for config in configs:
+            batches = []
+            for start in range(0, games, batch_size):
+                count = min(batch_size, games - start)
+                batches.append(pool.submit(play_games, config, policy_name, count, rng.getrandbits(64)))
+            futures.append((config, batches))
+
+        summaries = []
+        for config, batches in futures:
+            scores = []
+            for batch in batches:
+                scores.extend(batch.result())
+            summaries.append(summarize(config, scores, target))
+    return summaries
+
+
+def load_levels(path):
+    with open(path) as f:
+        levels = json.load(f)
+    return [
+        LevelConfig(
+            level.get("name", f"level {i + 1}"),
+            level.get("moves", 30),
+            level.get("gems", len(GEM_TYPES)),
+            level.get("rows", 8),
+            level.get("cols", 8),
+        )
+        for i, level in enumerate(levels)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate Gem Fusion Quest level difficulty by simulation")
+    parser.add_argument("--levels", help="JSON file of level configurations")
+    parser.add_argument("--moves", type=int, nargs="+", default=[30], help="Starting moves to try")
+    parser.add_argument("--gems", type=int, nargs="+", default=[len(GEM_TYPES)], help="Gem type counts to try")
+    parser.add_argument("--size", type=int, nargs="+", default=[8], help="Board sizes to try")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy", help="Policy the simulated player uses")
+    parser.add_argument("--games", type=int, default=200, help="Games per configuration")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--seed", type=int, help="Seed for a reproducible run")
+    parser.add_argument("--target", type=int, help="Score target to report success rates for")
+    parser.add_argument("--json", help="Write the summaries to this JSON file")
+    args = parser.parse_args()
+
+    if args.levels:
+        configs = load_levels(args.levels)
+    else:
+        configs = [
+            LevelConfig(f"{moves} moves, {gems} gems, {size}x{size}", moves, gems, size, size)
+            for size in args.size for gems in args.gems for moves in args.moves
+        ]
+
+    start = time.perf_counter()
+    summaries = estimate(configs, args.policy, args.games, args.workers, args.seed, args.target)
+    elapsed = time.perf_counter() - start
+
+    for summary in summaries:
+        line = (f"{summary['level']['name']:<32} mean {summary['mean']:8.1f}  sd {summary['stdev']:7.1f}  "
+                f"p10 {summary['p10']:6}  p50 {summary['p50']:6}  p90 {summary['p90']:6}")
+        if "success_rate" in summary:
+            line += f"  success {summary['success_rate']:.0%}"
+        print(line)
+    print(f"{len(configs) * args.games} games in {elapsed:.1f}s with the {args.policy} policy")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Tests for the NumPy board engine, checked against the bitboard engine.
+
+Run with: python -m pytest test_array_engine.py
+"""
+import random
+
+import pytest
+
+from board_engine import BoardEngine, EMPTY, GEM_TYPES, SPECIAL_TYPES
+
+pytest.importorskip("numpy")
+from array_engine import ArrayBoardEngine  # noqa: E402 (needs NumPy)
+
+
+def random_board(engine_class, rows, cols, gems, rng, special_chance=0.0):
+    """
+    Make a board of uniformly random gems, matches and all.
+    """
+    engine = engine_class(rows, cols, GEM_TYPES[:gems], seed=rng.getrandbits(32))
+    for row in range(rows):
+        for col in range(cols):
+            special = rng.randrange(1, len(SPECIAL_TYPES) + 1) if rng.random() < special_chance else 0
+            engine.set(row, col, rng.randrange(gems), special)
+    engine.mark_all_dirty()
+    return engine
+
+
+def board_state(engine):
+    return [[(engine.get(row, col), engine.get_special(row, col)) for col in range(engine.cols)]
+            for row in range(engine.rows)]
+
+
+def copy_board(source, engine_class):
+    engine = engine_class(source.rows, source.cols, source.gem_types, seed=0)
+    for row in range(source.rows):
+        for col in range(source.cols):
+            special = source.get_special(row, col)
+            engine.set(row, col, source.get(row, col), SPECIAL_TYPES.index(special) + 1 if special else 0)
+    engine.mark_all_dirty()
+    return engine
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_engines_agree(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(3, 12), rng.randint(3, 12)
+    bits = random_board(BoardEngine, rows, cols, rng.randint(2, 5), rng, special_chance=0.15)
+    array = copy_board(bits, ArrayBoardEngine)
+
+    matches = bits.find_matches(full=True)
+    assert matches == array.find_matches()
+    if not matches:
+        return
+
+    swapped = ((rng.randrange(rows), rng.randrange(cols)),)
+    bits_plan = bits.plan_clear(matches, swapped)
+    array_plan = array.plan_clear(matches, swapped)
+    assert bits_plan.cleared == array_plan.cleared
+    assert bits_plan.created == array_plan.created
+    assert bits_plan.points == array_plan.points
+    assert sorted(bits_plan.triggered) == sorted(array_plan.triggered)
+
+    bits.apply_clear(bits_plan)
+    array.apply_clear(array_plan)
+    assert board_state(bits) == board_state(array)
+    assert bits.apply_gravity() == array.apply_gravity()
+    assert board_state(bits) == board_state(array)
+
+
+def test_refill_leaves_no_gaps():
+    engine = ArrayBoardEngine(16, 16, GEM_TYPES[:5], seed=2)
+    engine.fill_initial()
+    assert not engine.find_matches(full=True)
+    for row in range(0, 16, 3):
+        engine.clear(row, row)
+    engine.apply_gravity()
+    engine.refill()
+    assert all(engine.get(row, col) != EMPTY for row in range(16) for col in range(16))
@@ -0,0 +1,96 @@
+"""
+Tests for the bitboard board engine.
+
+Run with: python -m pytest test_board_engine.py
+"""
+import random
+
+import pytest
+
+from board_engine import BoardEngine, EMPTY, GEM_TYPES
+
+
+def naive_matches(engine):
+    # Every maximal run of three or more, found one cell at a time
+    runs = set()
+    for row in range(engine.rows):
+        for col in range(engine.cols):
+            gem = engine.get(row, col)
+            if gem == EMPTY:
+                continue
+            for d_row, d_col in ((0, 1), (1, 0)):
+                if 0 <= row - d_row and 0 <= col - d_col and engine.get(row - d_row, col - d_col) == gem:
+                    continue  # Not the start of a run
+                run = [(row, col)]
+                while True:
+                    next_row, next_col = run[-1][0] + d_row, run[-1][1] + d_col
+                    if next_row >= engine.rows or next_col >= engine.cols or engine.get(next_row, next_col) != gem:
+                        break
+                    run.append((next_row, next_col))
+                if len(run) >= 3:
+                    runs.add(tuple(run))
+    return runs
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_find_matches_matches_naive_scan(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(3, 12), rng.randint(3, 12)
+    engine = BoardEngine(rows, cols, GEM_TYPES[:rng.randint(2, 5)], seed=seed)
+    for row in range(rows):
+        for col in range(cols):
+            engine.set(row, col, rng.randrange(len(engine.gem_types)))
+    engine.mark_all_dirty()
+    assert {tuple(match) for match in engine.find_matches(full=True)} == naive_matches(engine)
+
+
+def test_fill_initial_has_no_matches():
+    for seed in range(20):
+        engine = BoardEngine(8, 8, GEM_TYPES[:3], seed=seed)
+        engine.fill_initial()
+        assert not engine.find_matches(full=True)
+        assert all(engine.get(row, col) != EMPTY for row in range(8) for col in range(8))
+
+
+def test_swap_and_copy():
+    engine = BoardEngine(4, 4, GEM_TYPES[:4], seed=0)
+    engine.set(0, 0, 1, 2)
+    engine.set(0, 1, 3)
+    board = engine.copy()
+    engine.swap(0, 0, 0, 1)
+    assert (engine.get(0, 0), engine.get_special(0, 0)) == (3, None)
+    assert (engine.get(0, 1), engine.get_special(0, 1)) == (1, "bomb")
+    assert (board.get(0, 0), board.get_special(0, 0)) == (1, "bomb")
+
+
+def test_gravity_and_refill():
+    engine = BoardEngine(5, 3, GEM_TYPES[:3], seed=4)
+    engine.fill_initial()
+    column = [engine.get(row, 1) for row in range(5)]
+    engine.clear(4, 1)
+    engine.clear(2, 1)
+    moves = engine.apply_gravity()
+    assert moves == [(3, 4, 1), (1, 3, 1), (0, 2, 1)]
+    assert [engine.get(row, 1) for row in range(5)] == [EMPTY, EMPTY, column[0], column[1], column[3]]
+    engine.refill()
+    assert all(engine.get(row, col) != EMPTY for row in range(5) for col in range(3))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_dirty_scan_matches_full_scan(seed):
+    rng = random.Random(seed)
+    engine = BoardEngine(10, 9, GEM_TYPES[:4], seed=seed)
+    engine.fill_initial()
+    engine.mark_all_dirty()
+    for _ in range(30):
+        move = (rng.randrange(10), rng.randrange(8))
+        engine.swap(move[0], move[1], move[0], move[1] + 1)
+        matches = engine.find_matches()
+        while True:
+            assert matches == engine.copy().find_matches(full=True)
+            if not matches:
+                break
+            engine.apply_clear(engine.plan_clear(matches))
+            engine.apply_gravity()
+            engine.refill()
+            matches = engine.find_matches()
@@ -0,0 +1,67 @@
+"""
+Tests for the headless game and batch move evaluation.
+
+Run with: python -m pytest test_headless.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import headless
+from board_engine import GEM_TYPES
+from headless import HeadlessGame, evaluate_move, evaluate_moves
+
+
+def test_evaluate_moves_leaves_the_board_alone():
+    game = HeadlessGame(8, 8, seed=4)
+    before = game.engine.copy()
+    moves = sorted(game.valid_moves())
+    evaluations = evaluate_moves(game.engine, moves)
+    assert [evaluation.move for evaluation in evaluations] == moves
+    assert all(evaluation.valid for evaluation in evaluations)
+    assert game.engine.cells == before.cells
+
+    # With the board's own refills, an evaluation is exactly what playing it does
+    move = moves[0]
+    result = game.step(move)
+    assert evaluations[0].points == result.points
+
+
+def test_invalid_swaps_score_nothing():
+    game = HeadlessGame(8, 8, seed=4)
+    invalid = next((row, col, row, col + 1) for row in range(8) for col in range(7)
+                   if (row, col, row, col + 1) not in game.valid_moves())
+    assert not evaluate_move(game.engine, invalid).valid
+    with pytest.raises(ValueError):
+        evaluate_moves(game.engine, [(0, 0, 1, 1)])
+
+
+def test_fan_out_matches_serial(monkeypatch):
+    game = HeadlessGame(12, 12, gem_types=GEM_TYPES[:5], seed=9)
+    moves = sorted(game.valid_moves()) * 4
+    serial = evaluate_moves(game.engine, moves, seed=2)
+    monkeypatch.setattr(headless, "MIN_PARALLEL_MOVES", 1)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert evaluate_moves(game.engine, moves, seed=2, workers=3, executor=executor) == serial
+
+
+def test_small_batches_stay_in_process():
+    class RefusingExecutor:
+        def submit(self, *args):
+            raise AssertionError("a small batch was sent to the executor")
+
+    game = HeadlessGame(8, 8, seed=4)
+    moves = sorted(game.valid_moves())
+    assert len(moves) < headless.MIN_PARALLEL_MOVES
+    assert evaluate_moves(game.engine, moves, executor=RefusingExecutor()) == evaluate_moves(game.engine, moves)
+
+
+def test_worker_pool_is_reused(monkeypatch):
+    game = HeadlessGame(8, 8, seed=4)
+    moves = sorted(game.valid_moves())
+    monkeypatch.setattr(headless, "MIN_PARALLEL_MOVES", 1)
+    serial = evaluate_moves(game.engine, moves, seed=5)
+    assert evaluate_moves(game.engine, moves, seed=5, workers=2) == serial
+    pool = headless._pool
+    assert evaluate_moves(game.engine, moves, seed=5, workers=2) == serial
+    assert headless._pool is pool
@@ -0,0 +1,72 @@
+"""
+Tests for the legal-move indexes of both board engines.
+
+Run with: python -m pytest test_move_index.py
+"""
+import random
+
+import pytest
+
+from board_engine import BoardEngine, GEM_TYPES, MoveIndex
+from headless import make_move_index, resolve_cascade
+
+pytest.importorskip("numpy")
+from array_engine import ArrayBoardEngine  # noqa: E402 (needs NumPy)
+
+
+def brute_force_moves(engine):
+    # Every adjacent swap that leaves a match on the board
+    moves = set()
+    for row in range(engine.rows):
+        for col in range(engine.cols):
+            for row2, col2 in ((row, col + 1), (row + 1, col)):
+                if row2 >= engine.rows or col2 >= engine.cols:
+                    continue
+                board = engine.copy()
+                board.swap(row, col, row2, col2)
+                if board.find_matches(full=True):
+                    moves.add((row, col, row2, col2))
+    return moves
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("engine_class", [BoardEngine, ArrayBoardEngine])
+def test_move_index_matches_brute_force(seed, engine_class):
+    rng = random.Random(seed)
+    engine = engine_class(rng.randint(3, 10), rng.randint(3, 10), GEM_TYPES[:rng.randint(3, 6)], seed=seed)
+    engine.fill_initial()
+    index = make_move_index(engine)
+    assert index.moves == brute_force_moves(engine)
+    assert index.has_moves() == bool(index.moves)
+    for move in index.moves:
+        assert index.is_valid(*move)
+
+
+@pytest.mark.parametrize("engine_class", [BoardEngine, ArrayBoardEngine])
+def test_move_index_catches_up_after_changes(engine_class):
+    engine = engine_class(8, 8, GEM_TYPES[:4], seed=3)
+    engine.fill_initial()
+    index = make_move_index(engine)
+    for _ in range(20):
+        move = sorted(index.moves)[0]
+        engine.swap(*move)
+        resolve_cascade(engine, engine.find_matches(), (move[:2], move[2:]))
+        index.update()
+        assert index.moves == brute_force_moves(engine)
+        if not index.has_moves():
+            assert index.reshuffle()
+
+
+def test_reshuffle_makes_moves():
+    # Three colors in a repeating diagonal pattern leave no move at all
+    engine = BoardEngine(6, 6, GEM_TYPES[:3], seed=5)
+    for row in range(6):
+        for col in range(6):
+            engine.set(row, col, (row + col) % 3)
+    engine.mark_all_dirty()
+    index = MoveIndex(engine)
+    assert not index.has_moves()
+    assert index.hint() is None
+    assert index.reshuffle()
+    assert index.has_moves()
+    assert not engine.find_matches(full=True)
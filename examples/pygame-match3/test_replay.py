@@ -0,0 +1,81 @@
+"""
+Tests for the binary replay log.
+
+Run with: python -m pytest test_replay.py
+"""
+import random
+
+import pytest
+
+from board_engine import GEM_TYPES
+from headless import HeadlessGame, fast_forward
+from replay import HEADER, ReplayLog
+
+
+def play(seed, **kwargs):
+    game = HeadlessGame(8, 8, 15, GEM_TYPES[:5], seed=seed, **kwargs)
+    rng = random.Random(seed)
+    while not game.is_game_over():
+        game.step(game.random_move(rng))
+    return game
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip_replays_the_game(seed):
+    game = play(seed)
+    log = ReplayLog.from_bytes(game.replay.to_bytes())
+    assert (log.seed, log.rows, log.cols, log.start_moves, log.engine) == (seed, 8, 8, 15, "bitboard")
+    assert log.moves == game.replay.moves
+    assert len(game.replay.to_bytes()) == HEADER.size + 2 * len(log.moves)
+    assert fast_forward(log, GEM_TYPES[:5]).score == game.score
+
+
+def test_numpy_games_replay_on_numpy():
+    pytest.importorskip("numpy")
+    from array_engine import ArrayBoardEngine
+    game = play(3, engine_class=ArrayBoardEngine)
+    log = ReplayLog.from_bytes(game.replay.to_bytes())
+    assert log.engine == "numpy"
+    replayed = fast_forward(log, GEM_TYPES[:5])
+    assert isinstance(replayed.engine, ArrayBoardEngine)
+    assert replayed.score == game.score
+
+
+@pytest.mark.parametrize("args", [
+    dict(seed=1, rows=300, cols=100),
+    dict(seed=1, rows=256, cols=2),
+    dict(seed=1, rows=0, cols=8),
+    dict(seed=1, rows=200, cols=200),
+    dict(seed=-3),
+    dict(seed=1 << 64),
+    dict(seed=1, moves=70000),
+    dict(seed=1, engine="opengl"),
+])
+def test_unrecordable_games_are_rejected(args):
+    with pytest.raises(ValueError):
+        ReplayLog(**args)
+
+
+def test_largest_recordable_game():
+    log = ReplayLog((1 << 64) - 1, 255, 128, 0xFFFF, "numpy")
+    log.record((254, 127, 254, 126))
+    loaded = ReplayLog.from_bytes(log.to_bytes())
+    assert (loaded.seed, loaded.rows, loaded.cols, loaded.start_moves) == ((1 << 64) - 1, 255, 128, 0xFFFF)
+    assert loaded.moves == [(254, 126, 254, 127)]
+
+
+def test_bad_data_is_rejected():
+    data = ReplayLog(7).to_bytes()
+    for bad in (data[:-1], b"XXXX" + data[4:], data[:4] + bytes([9]) + data[5:], data[:-1] + bytes([5])):
+        with pytest.raises(ValueError):
+            ReplayLog.from_bytes(bad)
+
+
+def test_partial_move_is_rejected():
+    log = ReplayLog(7)
+    log.record((0, 0, 0, 1))
+    data = log.to_bytes()
+    assert ReplayLog.from_bytes(data).moves == [(0, 0, 0, 1)]
+    for bad in (data + b"\x01", data[:-1]):
+        with pytest.raises(ValueError):
+            ReplayLog.from_bytes(bad)
@@ -0,0 +1,151 @@
+"""
+Tests for special gems and cascade resolution on both board engines.
+
+Run with: python -m pytest test_specials.py
+"""
+import random
+
+import pytest
+
+from board_engine import BoardEngine, EMPTY, GEM_TYPES, SPECIAL_CASCADE_LIMIT, plan_specials
+from headless import HeadlessGame
+
+pytest.importorskip("numpy")
+from array_engine import ArrayBoardEngine  # noqa: E402 (needs NumPy)
+
+ENGINES = [BoardEngine, ArrayBoardEngine]
+
+
+def settle(engine, matches, swapped=(), max_steps=200):
+    """
+    Resolve a cascade step by step, as resolve_cascade does, but fail rather
+    than hang if a step clears nothing or the board never settles.
+
+    Returns:
+        The number of steps taken
+    """
+    steps = 0
+    while matches:
+        steps += 1
+        assert steps <= max_steps, "cascade did not settle"
+        plan = engine.plan_clear(matches, swapped, steps <= SPECIAL_CASCADE_LIMIT)
+        assert plan.cleared, "cascade step cleared nothing"
+        engine.apply_clear(plan)
+        engine.apply_gravity()
+        engine.refill()
+        matches = engine.find_matches()
+        swapped = ()
+    return steps
+
+
+def test_runs_make_specials():
+    four = [[(0, col) for col in range(4)]]
+    five = [[(row, 2) for row in range(5)]]
+    assert plan_specials(four) == {(0, 0): "line"}
+    assert plan_specials(four, swapped=((0, 2), (1, 2))) == {(0, 2): "line"}
+    assert plan_specials(five) == {(0, 2): "bomb"}
+    assert plan_specials([[(0, col) for col in range(3)]]) == {}
+
+
+def test_shapes_make_color_bombs():
+    ell = [[(2, col) for col in range(3)], [(row, 0) for row in range(3)]]
+    tee = [[(0, col) for col in range(3)], [(row, 1) for row in range(3)]]
+    assert plan_specials(ell) == {(2, 0): "color_bomb"}
+    assert plan_specials(tee) == {(0, 1): "color_bomb"}
+
+
+def test_solid_block_makes_one_color_bomb():
+    block = [[(row, col) for col in range(3)] for row in range(3)]
+    block += [[(row, col) for row in range(3)] for col in range(3)]
+    created = plan_specials(block, swapped=((1, 1),))
+    assert created == {(1, 1): "color_bomb"}
+
+
+def test_specials_skip_cells_that_fire():
+    five = [[(2, col) for col in range(5)]]
+    assert plan_specials(five, swapped=((2, 2), (1, 2)), fired={(2, 2)}) == {(2, 0): "bomb"}
+    assert plan_specials(five, fired={(2, 0), (2, 1)}) == {(2, 2): "bomb"}
+    assert plan_specials(five, fired=set(five[0])) == {}
+
+
+@pytest.mark.parametrize("engine_class", ENGINES)
+def test_fired_special_is_not_replaced(engine_class):
+    # Swapping a line gem into a run of 5 sets it off; the new bomb goes on
+    # another cell of the run, and the line's cell is cleared
+    engine = engine_class(5, 5, GEM_TYPES[:5], seed=1)
+    for row in range(5):
+        for col in range(5):
+            engine.set(row, col, (row * 2 + col) % 5)
+    for col in range(5):
+        engine.set(2, col, 4, 1 if col == 2 else 0)
+    engine.mark_all_dirty()
+    matches = engine.find_matches(full=True)
+    plan = engine.plan_clear(matches, swapped=((2, 2), (1, 2)))
+    assert plan.triggered == [(2, 2, "line")]
+    assert plan.created == [(2, 0, "bomb")]
+    assert (2, 2) in plan.cleared
+    engine.apply_clear(plan)
+    assert engine.get_special(2, 0) == "bomb"
+    assert engine.get(2, 2) == EMPTY
+
+
+@pytest.mark.parametrize("engine_class", ENGINES)
+def test_special_effects_chain(engine_class):
+    engine = engine_class(5, 5, GEM_TYPES[:5], seed=1)
+    for row in range(5):
+        for col in range(5):
+            engine.set(row, col, (row * 2 + col) % 5)
+    # A match at the top sets off a line in row 0, which reaches a bomb
+    engine.set(0, 0, 4)
+    engine.set(1, 0, 4, 1)
+    engine.set(2, 0, 4)
+    engine.set(1, 3, 1, 2)
+    engine.mark_all_dirty()
+    matches = [[(0, 0), (1, 0), (2, 0)]]
+    plan = engine.plan_clear(matches)
+    assert [special for _, _, special in plan.triggered] == ["line", "bomb"]
+    expected = {(0, 0), (2, 0)} | {(1, col) for col in range(5)}
+    expected |= {(row, col) for row in range(3) for col in range(2, 5)}
+    assert set(plan.cleared) == expected
+    assert plan.points == 30 + (len(expected) - 3) * 10
+
+
+@pytest.mark.parametrize("engine_class", ENGINES)
+def test_solid_block_cascade_terminates(engine_class):
+    engine = engine_class(5, 5, GEM_TYPES[:3], seed=1)
+    for row in range(5):
+        for col in range(5):
+            inside = 1 <= row <= 3 and 1 <= col <= 3
+            engine.set(row, col, 0 if inside else 1 + (row + col) % 2)
+    engine.mark_all_dirty()
+    matches = engine.find_matches(full=True)
+    plan = engine.plan_clear(matches)
+    assert len(plan.cleared) == 8
+    settle(engine, matches)
+    assert not engine.find_matches(full=True)
+
+
+@pytest.mark.parametrize("engine_class", ENGINES)
+@pytest.mark.parametrize("size, gems", [(8, 3), (32, 6)])
+def test_random_cascades_terminate(engine_class, size, gems):
+    # Dense boards and large boards make the longest cascades
+    for seed in range(10):
+        game = HeadlessGame(size, size, 15, GEM_TYPES[:gems], engine_class=engine_class, seed=seed)
+        rng = random.Random(seed)
+        for _ in range(15):
+            row1, col1, row2, col2 = move = rng.choice(game.valid_moves())
+            game.engine.swap(*move)
+            settle(game.engine, game.engine.find_matches(), ((row1, col1), (row2, col2)))
+            assert not game.engine.find_matches(full=True)
+            game.move_index.update()
+            if not game.move_index.has_moves():
+                game.move_index.reshuffle()
+
+
+def test_headless_games_finish():
+    for seed in range(10):
+        game = HeadlessGame(8, 8, 20, GEM_TYPES[:3], seed=seed)
+        rng = random.Random(seed)
+        while not game.is_game_over():
+            game.step(game.random_move(rng))
+        assert not game.engine.find_matches(full=True)